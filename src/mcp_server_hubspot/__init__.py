@@ -1,9 +1,8 @@
 import argparse
-import asyncio
 import logging
-from .server import Server
+from .server import Server, _run_event_loop
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger('mcp_hubspot')
 
 def main():
@@ -12,11 +11,12 @@ def main():
     parser.add_argument('--access-token', help='HubSpot access token')
     args = parser.parse_args()
     
-    logger.debug(f"Access token from args: {args.access_token}")
+    # Never log the token itself, only whether one was passed
+    logger.debug("Access token from args: %s", "[PROVIDED]" if args.access_token else "[NOT PROVIDED]")
     # Run the async main function
     logger.debug("About to run server")
     server = Server()
-    asyncio.run(server.run())
+    _run_event_loop(server.run())
     logger.debug("Server completed")
 
 if __name__ == "__main__":
@@ -1,7 +1,12 @@
 """Industry validation and normalization for HubSpot companies"""
 
+import functools
+import re
+import string
+import sys
+
 # Test subset of industries for development/testing
-TEST_INDUSTRIES = {
+TEST_INDUSTRIES = frozenset({
     "BANKING",
     "FINANCIAL_SERVICES",
     "INSURANCE", 
@@ -18,10 +23,10 @@ TEST_INDUSTRIES = {
     "BUSINESS_SERVICES",
     "MANUFACTURING",
     "INFORMATION_TECHNOLOGY_AND_SERVICES"
-}
+})
 
 # Complete list of approved industries for production
-APPROVED_INDUSTRIES = {
+APPROVED_INDUSTRIES = frozenset({
     "ACCOUNTING",
     "AIRLINES_AVIATION",
     "ALTERNATIVE_DISPUTE_RESOLUTION",
@@ -169,8 +174,63 @@ APPROVED_INDUSTRIES = {
     "WINE_AND_SPIRITS",
     "WIRELESS",
     "WRITING_AND_EDITING"
+})
+
+# Common variations mapped to their approved test-mode industry
+_TEST_ALIASES = {
+    "TECH": "TECHNOLOGY",
+    "IT": "TECHNOLOGY",
+    "IT_SERVICES": "TECHNOLOGY",
+    "HEALTHCARE": "HEALTH_CARE",
+    "FINANCE": "FINANCIAL_SERVICES",
+    "BANKING_AND_FINANCE": "FINANCIAL_SERVICES",
+    "ECOMMERCE": "E_COMMERCE"
+}
+
+# Common variations mapped to their approved production industry
+_PROD_ALIASES = {
+    "MANUFACTURING": "INDUSTRIAL_AUTOMATION",
+    "INDUSTRIAL_MANUFACTURING": "INDUSTRIAL_AUTOMATION",
+    "IT_SERVICES": "INFORMATION_TECHNOLOGY_AND_SERVICES",
+    "IT": "INFORMATION_TECHNOLOGY_AND_SERVICES",
+    "TECH": "INFORMATION_TECHNOLOGY_AND_SERVICES",
+    "TECHNOLOGY": "INFORMATION_TECHNOLOGY_AND_SERVICES",
+    "SOFTWARE": "COMPUTER_SOFTWARE",
+    "SOFTWARE_DEVELOPMENT": "COMPUTER_SOFTWARE",
+    "REAL_ESTATE_COMMERCIAL": "COMMERCIAL_REAL_ESTATE",
+    "HEALTHCARE": "HOSPITAL_HEALTH_CARE",
+    "HEALTH_CARE": "HOSPITAL_HEALTH_CARE",
+    "EDUCATION": "EDUCATION_MANAGEMENT",
+    "CONSULTING": "MANAGEMENT_CONSULTING",
+    "MARKETING": "MARKETING_AND_ADVERTISING",
+    "ADVERTISING": "MARKETING_AND_ADVERTISING",
+    "LEGAL": "LEGAL_SERVICES",
+    "LAW": "LEGAL_SERVICES",
+    "FINANCE": "FINANCIAL_SERVICES",
+    "BANKING_AND_FINANCE": "FINANCIAL_SERVICES",
+    "MANUFACTURING_INDUSTRIAL": "INDUSTRIAL_AUTOMATION",
+    "INDUSTRIAL": "INDUSTRIAL_AUTOMATION",
+    "MEDIA": "MEDIA_PRODUCTION",
+    "ENTERTAINMENT_AND_MEDIA": "ENTERTAINMENT"
 }
 
+# Approved industries that resolve to themselves. Names that are also alias
+# keys (e.g. test-mode FINANCE) are excluded so their alias still applies.
+_TEST_CANONICAL = TEST_INDUSTRIES.difference(_TEST_ALIASES)
+_PROD_CANONICAL = APPROVED_INDUSTRIES.difference(_PROD_ALIASES)
+
+# Byte table uppercasing ASCII letters and mapping hyphens/whitespace to "_"
+_NORMALIZE_TABLE = bytes.maketrans(
+    string.ascii_lowercase.encode() + b"-" + string.whitespace.encode(),
+    string.ascii_uppercase.encode() + b"_" * (1 + len(string.whitespace)),
+)
+
+# Runs of underscores collapsed to one during normalization
+_UNDERSCORE_RUNS_RE = re.compile(rb"__+")
+
+# The only bytes allowed in a V3 industry value
+_V3_INDUSTRY_BYTES = string.ascii_uppercase.encode() + b"_"
+
 def normalize_industry(industry: str | None, test_mode: bool = False) -> str:
     """
     Normalize an industry string to match the approved format
@@ -182,60 +242,70 @@ def normalize_industry(industry: str | None, test_mode: bool = False) -> str:
     Raises:
         ValueError: If industry value doesn't match V3 API format
     """
-    if industry is None or industry.strip() == "":
+    # Strip once up front; the stripped value also serves as the cache key
+    industry = industry.strip() if industry else ""
+    if not industry:
         return ""
-    
-    # Convert to uppercase and normalize separators to underscores
-    normalized = industry.upper().strip()
-    normalized = normalized.replace("-", " ").replace("  ", " ")  # Convert hyphens to spaces and clean up double spaces
-    normalized = normalized.replace(" ", "_")  # Convert spaces to underscores
-    normalized = "_".join(filter(None, normalized.split("_")))  # Clean up multiple underscores
+    return _normalize_and_classify(industry, test_mode)[0]
+
+@functools.lru_cache(maxsize=2048)
+def _format_industry(industry: str) -> str:
+    """
+    Convert a non-empty industry string to V3 API format without resolving
+    aliases. Cached like _normalize_and_classify; ValueErrors are not cached.
+    """
+    # V3 industry values are ASCII, so work on bytes: one table pass uppercases
+    # and maps separators to underscores, then runs of underscores collapse
+    try:
+        encoded = industry.encode("ascii")
+    except UnicodeEncodeError:
+        raise ValueError(f"Industry must be uppercase with underscores (V3 API format). Got: {industry.upper()}") from None
+    encoded = _UNDERSCORE_RUNS_RE.sub(b"_", encoded.translate(_NORMALIZE_TABLE)).strip(b"_")
+    normalized = encoded.decode("ascii")
 
-    # Validate format matches V3 API requirements (all uppercase with underscores)
-    if not all(c.isupper() or c == '_' for c in normalized):
+    # Validate format matches V3 API requirements (all uppercase with underscores):
+    # deleting every allowed byte must leave nothing behind
+    if encoded.translate(None, _V3_INDUSTRY_BYTES):
         raise ValueError(f"Industry must be uppercase with underscores (V3 API format). Got: {normalized}")
-    
+
+    # Intern so set probes and later equality checks between normalized
+    # industries can short-circuit on identity
+    return sys.intern(normalized)
+
+@functools.lru_cache(maxsize=2048)
+def _normalize_and_classify(industry: str, test_mode: bool) -> tuple[str, bool]:
+    """
+    Normalize a non-empty industry string and report whether the result is an
+    approved industry. Cached, since inputs come from a small, heavily repeated
+    vocabulary; ValueErrors are raised, not cached.
+    """
+    normalized = _format_industry(industry)
+
+    # Already-canonical names need no alias lookup
+    if normalized in (_TEST_CANONICAL if test_mode else _PROD_CANONICAL):
+        return normalized, True
+
     # Handle special cases and common variations
-    test_aliases = {
-        "TECH": "TECHNOLOGY",
-        "IT": "TECHNOLOGY",
-        "IT_SERVICES": "TECHNOLOGY",
-        "TECHNOLOGY": "TECHNOLOGY",  # Ensure TECHNOLOGY maps to itself
-        "HEALTHCARE": "HEALTH_CARE",
-        "FINANCE": "FINANCIAL_SERVICES",
-        "BANKING_AND_FINANCE": "FINANCIAL_SERVICES",
-        "ECOMMERCE": "E_COMMERCE"
-    } if test_mode else {
-        "MANUFACTURING": "INDUSTRIAL_AUTOMATION",
-        "INDUSTRIAL_MANUFACTURING": "INDUSTRIAL_AUTOMATION",
-        "IT_SERVICES": "INFORMATION_TECHNOLOGY_AND_SERVICES",
-        "IT": "INFORMATION_TECHNOLOGY_AND_SERVICES",
-        "TECH": "INFORMATION_TECHNOLOGY_AND_SERVICES",
-        "TECHNOLOGY": "INFORMATION_TECHNOLOGY_AND_SERVICES",
-        "SOFTWARE": "COMPUTER_SOFTWARE",
-        "SOFTWARE_DEVELOPMENT": "COMPUTER_SOFTWARE",
-        "REAL_ESTATE_COMMERCIAL": "COMMERCIAL_REAL_ESTATE",
-        "HEALTHCARE": "HOSPITAL_HEALTH_CARE",
-        "HEALTH_CARE": "HOSPITAL_HEALTH_CARE",
-        "EDUCATION": "EDUCATION_MANAGEMENT",
-        "CONSULTING": "MANAGEMENT_CONSULTING",
-        "MARKETING": "MARKETING_AND_ADVERTISING",
-        "ADVERTISING": "MARKETING_AND_ADVERTISING",
-        "LEGAL": "LEGAL_SERVICES",
-        "LAW": "LEGAL_SERVICES",
-        "FINANCE": "FINANCIAL_SERVICES",
-        "BANKING_AND_FINANCE": "FINANCIAL_SERVICES",
-        "MANUFACTURING_INDUSTRIAL": "INDUSTRIAL_AUTOMATION",
-        "INDUSTRIAL": "INDUSTRIAL_AUTOMATION",
-        "MEDIA": "MEDIA_PRODUCTION",
-        "ENTERTAINMENT_AND_MEDIA": "ENTERTAINMENT"
-    }
+    aliases = _TEST_ALIASES if test_mode else _PROD_ALIASES
     
     # Check aliases first
-    if normalized in test_aliases:
-        normalized = test_aliases[normalized]
-    
-    return normalized
+    if normalized in aliases:
+        normalized = aliases[normalized]
+
+    valid_industries = TEST_INDUSTRIES if test_mode else APPROVED_INDUSTRIES
+    return normalized, normalized in valid_industries
+
+def industry_variants(industry: str, test_mode: bool = False) -> list[str]:
+    """
+    List the raw values that normalize to an already-normalized industry
+    Args:
+        industry: Normalized industry value
+        test_mode: Whether to use test subset of industries
+    Returns:
+        The industry itself followed by every alias key that maps to it
+    """
+    aliases = _TEST_ALIASES if test_mode else _PROD_ALIASES
+    return [industry] + [alias for alias, target in aliases.items() if target == industry]
 
 def is_valid_industry(industry: str | None, test_mode: bool = False, allow_custom: bool = False) -> bool:
     """
@@ -247,19 +317,17 @@ def is_valid_industry(industry: str | None, test_mode: bool = False, allow_custo
     Returns:
         True if industry is valid, False otherwise
     """
-    if industry is None or industry.strip() == "":
+    industry = industry.strip() if industry else ""
+    if not industry:
         return False
         
     try:
-        normalized = normalize_industry(industry, test_mode)
-        if not normalized:
-            return False
+        # If custom industries are allowed, any properly formatted value is
+        # valid, so aliases and the approved list need not be consulted
+        if allow_custom:
+            return bool(_format_industry(industry))
+        approved = _normalize_and_classify(industry, test_mode)[1]
     except ValueError:
         return False
 
-    # If custom industries are allowed, any properly formatted value is valid
-    if allow_custom:
-        return True
-        
-    valid_industries = TEST_INDUSTRIES if test_mode else APPROVED_INDUSTRIES
-    return normalized in valid_industries
+    return approved
@@ -1,10 +1,31 @@
 #!/usr/bin/env python3
-from typing import Dict, Any, List
-from urllib.parse import urlparse
+from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+from collections import OrderedDict
+from datetime import datetime
+import functools
+import heapq
 import json
+import logging
 import os
+import sys
+import time
 from hubspot import HubSpot
-from .industries import normalize_industry, is_valid_industry
+from hubspot.discovery.discovery_base import DiscoveryBase
+from urllib3.util import make_headers
+from urllib3.util.retry import Retry
+try:
+    import orjson
+except ImportError:  # optional speedup, see the "speedups" extra
+    orjson = None
+try:
+    import uvloop  # type: ignore[import]
+except ImportError:  # optional speedup, see the "speedups" extra
+    uvloop = None
+from rapidfuzz import process as fuzzy_process
+from rapidfuzz.distance import Levenshtein as FuzzyLevenshtein
+from .industries import normalize_industry, is_valid_industry, industry_variants
 
 from mcp.server import Server as McpServer
 from mcp.server.stdio import stdio_server
@@ -13,29 +34,222 @@ from mcp.types import (
     ListToolsRequest,
 )
 
+logger = logging.getLogger('mcp_hubspot')
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values the JSON encoder doesn't handle natively"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if hasattr(obj, "to_dict") and hasattr(obj, "id") and hasattr(obj, "properties"):
+        # HubSpot SDK records (SimplePublicObject and friends); not every
+        # record type has the timestamps
+        return {
+            "id": obj.id,
+            "properties": obj.properties,
+            "created_at": getattr(obj, "created_at", None),
+            "updated_at": getattr(obj, "updated_at", None),
+            "archived": getattr(obj, "archived", None)
+        }
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_errors(method):
+    """Return any exception raised by method as a JSON {"error": ...} string"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            return _dump({"error": str(e)})
+    return wrapper
+
+def _dump(obj: Any) -> str:
+    """Serialize to compact JSON text, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default).decode()
+    return json.dumps(obj, default=_json_default, ensure_ascii=False, separators=(",", ":"))
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_domain(domain: str) -> str:
+    """
+    Normalize domain by removing www, http(s), and trailing slashes.
+    Cached: the criteria domain is compared against every company, and
+    company domains recur across searches.
+    """
+    # Remove protocol and anything after the host if present; plain splits
+    # avoid the cost of a full urlparse
+    if "://" in domain:
+        domain = domain.split("://", 1)[1]
+        domain = domain.split("/", 1)[0].split("?", 1)[0].split("#", 1)[0]
+    # Remove spaces and case-fold once
+    domain = domain.strip().lower()
+    # Remove www
+    if domain[:4] == "www.":
+        domain = domain[4:]
+    # Remove trailing slash
+    return domain.rstrip("/")
+
+# Weight of each criterion in _calculate_match_score
+_MATCH_WEIGHTS = {
+    "name": 0.4,
+    "domain": 0.3,
+    "industry": 0.2,
+    "other": 0.1
+}
+
+# Criteria scored individually; any other keys are compared as "other" properties
+_CORE_CRITERIA = frozenset({"name", "domain", "industry"})
+
+# Weight of each criterion in find_companies' overall match score
+_FIND_WEIGHTS = {"name": 0.5, "domain": 0.3, "industry": 0.2}
+
+# Most batch update requests kept in flight at once by batch_update_companies.
+# This bounds concurrency, not request rate; 429s are retried by the SDK
+_BATCH_UPDATE_WORKERS = 10
+
+# Contact updates/deletes arriving within this many seconds of each other
+# are sent to HubSpot together, up to the batch endpoints' 100 inputs
+_CONTACT_BATCH_WINDOW = 0.01
+_CONTACT_BATCH_SIZE = 100
+
+# find_companies tool responses are reused for this many seconds, or until
+# a company is written through the server
+_FIND_CACHE_SIZE = 256
+_FIND_CACHE_TTL = 60.0
+
+# Worker threads for blocking HubSpot calls made by the MCP server
+_HUBSPOT_WORKERS = 8
+
+# Keep-alive connections per SDK connection pool; enough for every worker
+# thread that can be calling HubSpot at once
+_CONNECTION_POOL_SIZE = 32
+
+# gzip/deflate, plus br and zstd when their decoders are installed
+_ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+# The search API returns at most this many results for a query and rejects
+# requests to page past them
+_SEARCH_RESULT_LIMIT = 10000
+
+# HubSpot's per-app limit is 100 requests per 10 seconds. The server starts
+# at most that many tool calls per 10 seconds, but a single call (a company
+# scan, batch update or fallback) can make many HTTP requests, so this
+# smooths bursts rather than enforcing the limit; requests that still get
+# a 429 are retried with backoff (honouring Retry-After) before the error
+# is surfaced. Only failures where HubSpot can't have acted on the request
+# are retried, so a create or batch update that timed out is never sent twice
+_RATE_LIMIT_REQUESTS = 100
+_RATE_LIMIT_PERIOD = 10.0
+_RATE_LIMIT_RETRY = Retry(
+    total=None,
+    connect=3,
+    read=0,
+    other=0,
+    status=5,
+    status_forcelist=(429,),
+    allowed_methods=None,
+    backoff_factor=1,
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+class _TTLCache:
+    """Bounded LRU mapping whose entries expire ttl seconds after being stored"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key: Any) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value: Any):
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+class _RateLimiter:
+    """Token bucket allowing max_rate acquisitions per time_period seconds"""
+
+    def __init__(self, max_rate: int, time_period: float):
+        self._capacity = float(max_rate)
+        self._tokens = float(max_rate)
+        self._rate = max_rate / time_period
+        self._updated = None
+
+    async def __aenter__(self):
+        now = asyncio.get_running_loop().time()
+        if self._updated is not None:
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        # Reserve a token straight away, going into debt if there is none, and
+        # wait until it has been earned; later callers queue up behind it
+        # without anything being held while they sleep
+        self._tokens -= 1
+        if self._tokens < 0:
+            try:
+                await asyncio.sleep(-self._tokens / self._rate)
+            except asyncio.CancelledError:
+                self._tokens += 1
+                raise
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
 class HubSpotClient:
+    __slots__ = ("client", "_apis", "_api_clients")
+
     def __init__(self, api_key: str):
-        self.client = HubSpot(access_token=api_key)
+        self.client = HubSpot(
+            access_token=api_key,
+            retry=_RATE_LIMIT_RETRY,
+            connection_pool_maxsize=_CONNECTION_POOL_SIZE,
+            api_factory=self._cached_api_factory
+        )
+        self._apis = {}
+        self._api_clients = {}
+
+    def _cached_api_factory(self, api_client_package, api_name, config):
+        """
+        Build each SDK API object once and reuse it
+        The SDK otherwise constructs a new API object, with its own urllib3
+        connection pool, on every access like client.crm.companies.basic_api,
+        so no connection was ever reused across calls. APIs from the same
+        package (basic, batch, search) also share one ApiClient and pool.
+        """
+        key = (api_client_package.__name__, api_name)
+        api = self._apis.get(key)
+        if api is None:
+            api_client = self._api_clients.get(api_client_package.__name__)
+            if api_client is None:
+                api = DiscoveryBase._default_api_factory(api_client_package, api_name, config)
+                # Ask for compressed responses in every encoding urllib3 can decode
+                api.api_client.set_default_header("Accept-Encoding", _ACCEPT_ENCODING)
+                self._api_clients.setdefault(api_client_package.__name__, api.api_client)
+            else:
+                api = getattr(api_client_package, api_name)(api_client=api_client)
+            api = self._apis.setdefault(key, api)
+        return api
 
     def _match_domains(self, criteria_domain: str, company_domain: str) -> float:
         """Match domains with support for variations and subdomains"""
         if not criteria_domain or not company_domain:
             return 0.0
 
-        def normalize_domain(domain: str) -> str:
-            """Normalize domain by removing www, http(s), and trailing slashes"""
-            # Remove protocol if present
-            if "://" in domain:
-                domain = urlparse(domain).netloc
-            # Remove www
-            if domain.startswith("www."):
-                domain = domain[4:]
-            # Remove trailing slash and spaces
-            domain = domain.rstrip("/").strip().lower()
-            return domain
-
-        criteria_domain = normalize_domain(criteria_domain)
-        company_domain = normalize_domain(company_domain)
+        criteria_domain = _normalize_domain(criteria_domain)
+        company_domain = _normalize_domain(company_domain)
 
         # Exact match
         if criteria_domain == company_domain:
@@ -52,46 +266,38 @@ class HubSpotClient:
         if base_criteria == base_company:
             return 0.8
         
-        # Use Levenshtein for fuzzy matching of base domains
-        base_similarity = self.levenshtein_ratio(base_criteria, base_company)
-        if base_similarity > 0.8:
-            return base_similarity * 0.7  # Scale down fuzzy matches
+        # Use Levenshtein for fuzzy matching of base domains; the cutoff skips
+        # the edit distance entirely when the lengths alone rule out > 0.8
+        base_similarity = self.levenshtein_ratio(base_criteria, base_company, score_cutoff=0.8)
+        return base_similarity * 0.7 if base_similarity > 0.8 else 0.0  # Scale down fuzzy matches
 
-        return 0.0
-
-    def levenshtein_ratio(self, s1: str, s2: str) -> float:
-        """Calculate the similarity ratio between two strings using Levenshtein distance"""
+    def levenshtein_ratio(self, s1: str, s2: str, score_cutoff: float = 0.0) -> float:
+        """
+        Calculate the similarity ratio between two strings using Levenshtein distance
+        Args:
+            s1, s2: Strings to compare
+            score_cutoff: Ratios at or below this value are not needed by the
+                caller and may be reported as 0.0, letting the distance
+                computation stop early
+        Returns:
+            Similarity ratio from 0.0 to 1.0
+        """
         if not s1 or not s2:
             return 0.0
         
-        # Get lengths of both strings
-        len1, len2 = len(s1), len(s2)
-        if len1 == 0 or len2 == 0:
+        max_len = float(max(len(s1), len(s2)))
+        # Largest distance that can still score above the cutoff; the C
+        # implementation stops as soon as the distance is known to exceed it
+        max_distance = int((1.0 - score_cutoff) * max_len)
+        # The distance is at least the length difference, so skip the DP
+        # entirely when that alone rules out a match
+        if abs(len(s1) - len(s2)) > max_distance:
             return 0.0
-            
-        # Create matrix of zeros
-        matrix = [[0 for x in range(len2 + 1)] for x in range(len1 + 1)]
-        
-        # Initialize first row and column
-        for i in range(len1 + 1):
-            matrix[i][0] = i
-        for j in range(len2 + 1):
-            matrix[0][j] = j
-            
-        # Fill rest of the matrix
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                if s1[i-1] == s2[j-1]:
-                    matrix[i][j] = matrix[i-1][j-1]
-                else:
-                    matrix[i][j] = min(
-                        matrix[i-1][j] + 1,    # deletion
-                        matrix[i][j-1] + 1,    # insertion
-                        matrix[i-1][j-1] + 1   # substitution
-                    )
         
-        distance = float(matrix[len1][len2])
-        max_len = float(max(len1, len2))
+        # rapidfuzz computes the edit distance in C
+        distance = FuzzyLevenshtein.distance(s1, s2, score_cutoff=max_distance)
+        if distance > max_distance:
+            return 0.0
         
         # Convert distance to similarity ratio
         return 1.0 - (distance / max_len)
@@ -100,12 +306,7 @@ class HubSpotClient:
         """Calculate how well a company matches the search criteria"""
         score = 0.0
         total_weight = 0.0
-        weights = {
-            "name": 0.4,
-            "domain": 0.3,
-            "industry": 0.2,
-            "other": 0.1
-        }
+        weights = _MATCH_WEIGHTS
 
         properties = company.get("properties", {})
         if not properties:
@@ -133,7 +334,7 @@ class HubSpotClient:
                 name_matched = True
             # Fuzzy match if enabled
             elif fuzzy_match:
-                name_score = self.levenshtein_ratio(criteria_name, company_name)
+                name_score = self.levenshtein_ratio(criteria_name, company_name, score_cutoff=0.5)
                 if name_score > 0.5:
                     # Boost score for very close matches
                     if name_score > 0.9:
@@ -168,7 +369,7 @@ class HubSpotClient:
                 industry_matched = True
             # Fuzzy match if enabled
             elif fuzzy_match:
-                industry_score = self.levenshtein_ratio(criteria_industry, company_industry)
+                industry_score = self.levenshtein_ratio(criteria_industry, company_industry, score_cutoff=0.6)
                 if industry_score > 0.6:
                     # Boost score for very close matches
                     if industry_score > 0.9:
@@ -182,7 +383,7 @@ class HubSpotClient:
             total_weight += weights["industry"]
 
         # Other properties
-        other_props = {k: v for k, v in criteria.items() if k not in ["name", "domain", "industry"]}
+        other_props = {k: v for k, v in criteria.items() if k not in _CORE_CRITERIA}
         if other_props:
             other_score = 0.0
             matched_props = 0
@@ -193,7 +394,7 @@ class HubSpotClient:
                         other_score += 1.0
                         matched_props += 1
                     elif fuzzy_match:
-                        prop_score = self.levenshtein_ratio(str(value).lower(), str(properties[prop]).lower())
+                        prop_score = self.levenshtein_ratio(str(value).lower(), str(properties[prop]).lower(), score_cutoff=0.7)
                         if prop_score > 0.7:  # Only count if similarity is above threshold
                             other_score += prop_score
                             matched_props += 1
@@ -218,43 +419,161 @@ class HubSpotClient:
         final_score = min(1.0, score / total_weight if total_weight > 0 else 0.0)
         return final_score
         
-    def find_companies(self, criteria: Dict[str, Any], fuzzy_match: bool = True, threshold: float = 0.7) -> List[Dict[str, Any]]:
+    def _iter_company_pages(self, properties: List[str], filter_groups: Optional[List[Dict[str, Any]]] = None):
+        """
+        Yield non-empty pages of companies, fetching the next page in a
+        background thread while the caller scores the current one, so network
+        latency overlaps with matching instead of adding to it
+        Args:
+            properties: Company properties to return
+            filter_groups: Search API filter groups; when given, HubSpot filters
+                companies server-side instead of listing all of them, unless
+                more match than the search API can page through
+        """
+        get_page = self.client.crm.companies.basic_api.get_page
+        def list_page(after: Optional[str]) -> Any:
+            return get_page(limit=100, after=after, properties=properties)
+        fetch_page = list_page
+        
+        page = None
+        if filter_groups:
+            search = self.client.crm.companies.search_api.do_search
+            def search_page(after: Optional[str]) -> Any:
+                request = {"filterGroups": filter_groups, "properties": properties, "limit": 100}
+                if after is not None:
+                    request["after"] = after
+                return search(public_object_search_request=request)
+            page = search_page(None)
+            if page.total > _SEARCH_RESULT_LIMIT:
+                page = None
+            else:
+                fetch_page = search_page
+        if page is None:
+            page = list_page(None)
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="hubspot-pages") as executor:
+            while page.results:
+                pending = executor.submit(fetch_page, page.paging.next.after) if page.paging else None
+                yield page
+                if pending is None:
+                    return
+                page = pending.result()
+
+    @staticmethod
+    def _lowered_name(company: Any) -> Optional[str]:
+        """Lowercased company name, or None if the company has no name"""
+        name = company.properties.get("name")
+        return str(name).lower() if name is not None else None
+
+    def _fuzzy_name_scores(self, criteria_name: str, company_names: List[Optional[str]], score_cutoff: float) -> Dict[int, float]:
+        """
+        Fuzzy-score every company name on a page against the criteria name in one call
+        Names that match exactly or as a substring are skipped since
+        find_companies scores those without Levenshtein
+        Args:
+            criteria_name: Lowercased criteria name
+            company_names: Lowercased company names (None if unset) from a single results page
+            score_cutoff: Similarity below which scores are reported as 0.0
+        Returns:
+            Dict mapping the index of each fuzzy-matched company to its name similarity
+        """
+        if not criteria_name:
+            return {}
+        candidates = {}
+        for index, company_name in enumerate(company_names):
+            if company_name is not None and criteria_name not in company_name:
+                candidates[index] = company_name
+        if not candidates:
+            return {}
+        # rapidfuzz checks the cutoff as a normalized distance, which can drop a
+        # score sitting exactly on it through rounding; loosen it slightly since
+        # find_companies compares the final score against threshold anyway
+        matches = fuzzy_process.extract(
+            criteria_name, candidates, scorer=FuzzyLevenshtein.normalized_similarity,
+            score_cutoff=max(0.0, score_cutoff - 1e-6), limit=None
+        )
+        return {index: score for _, score, index in matches}
+
+    def find_companies(self, criteria: Dict[str, Any], fuzzy_match: bool = True, threshold: float = 0.7, top_n: Optional[int] = None, use_search: bool = True) -> List[Dict[str, Any]]:
         """
         Find companies matching the given criteria
         Args:
             criteria: Dict of company properties to match against
             fuzzy_match: Whether to use fuzzy matching for strings
             threshold: Minimum match score to include in results (0.0 to 1.0)
+            top_n: Only return the best top_n matches (all matches if None)
+            use_search: Whether HubSpot's search index may narrow the scan; it
+                lags writes by a few seconds, so callers that write based on
+                the result should pass False
         Returns:
             List of matching companies with their match scores and details
         """
-        print(f"Searching companies with criteria: {criteria}")
-        if "industry" in criteria:
-            print(f"Industry search criteria: {criteria['industry']}, normalized: {normalize_industry(criteria['industry'])}")
+        # Checked once so the per-company debug messages cost nothing when off
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Searching companies with criteria: %s", criteria)
+        
+        # Lowest fuzzy name score that could still reach the threshold if every
+        # other searched criterion matched perfectly; anything at or below it
+        # is not worth computing exactly
+        name_cutoff = 0.0
+        if "name" in criteria:
+            searched_weight = sum(w for key, w in _FIND_WEIGHTS.items() if key in criteria)
+            name_weight = _FIND_WEIGHTS["name"]
+            name_cutoff = max(0.0, (threshold * searched_weight - (searched_weight - name_weight)) / name_weight - 1e-9)
+        
+        # Fetch full pages with only the properties being compared; the
+        # default page size is 10 and the default properties omit industry
+        fetch_properties = ["name", "domain", "industry"] + [k for k in criteria if k not in _CORE_CRITERIA]
+        
+        # Normalized once here; every company is compared against them
+        criteria_name = str(criteria["name"]).lower() if "name" in criteria else None
+        criteria_industry = normalize_industry(criteria["industry"]) if "industry" in criteria else None
+        if debug and criteria_industry is not None:
+            logger.debug("Industry search criteria: %s, normalized: %s", criteria["industry"], criteria_industry)
+        
+        # Without fuzzy matching, a company can only score on an industry-only
+        # search by matching it exactly, so let HubSpot do the filtering
+        filter_groups = None
+        if use_search and not fuzzy_match and threshold > 0 and criteria.keys() == {"industry"}:
+            if criteria_industry:
+                filter_groups = [{"filters": [{
+                    "propertyName": "industry",
+                    "operator": "IN",
+                    "values": industry_variants(criteria_industry)
+                }]}]
         
         all_companies = []
-        after = None
+        # Min-heap of (match_score, -sequence, match) when only the best top_n
+        # are wanted; the sequence keeps ties in scan order like a stable sort
+        top_matches = []
+        sequence = 0
         
-        while True:
-            companies_page = self.client.crm.companies.basic_api.get_page(after=after)
-            if not companies_page.results:
-                break
-                
-            for company in companies_page.results:
+        for companies_page in self._iter_company_pages(fetch_properties, filter_groups):
+            page = companies_page.results
+            # Pull the page's names out into one list up front; the fuzzy scorer
+            # and the exact/substring checks below both read from it
+            company_names = None
+            fuzzy_name_scores = {}
+            if criteria_name is not None:
+                company_names = [self._lowered_name(company) for company in page]
+                if fuzzy_match:
+                    fuzzy_name_scores = self._fuzzy_name_scores(criteria_name, company_names, name_cutoff)
+            
+            for index, company in enumerate(page):
                 match_details = {}
                 properties = company.properties
                 
                 # Name matching
                 name_score = 0.0
-                if "name" in criteria and "name" in properties and properties["name"] is not None:
-                    company_name = str(properties["name"]).lower()
-                    criteria_name = str(criteria["name"]).lower()
+                company_name = company_names[index] if company_names is not None else None
+                if criteria_name is not None and company_name is not None:
                     if criteria_name == company_name:
                         name_score = 1.0
                     elif criteria_name in company_name:
                         name_score = 0.9
                     elif fuzzy_match:
-                        name_score = self.levenshtein_ratio(criteria["name"].lower(), properties["name"].lower())
+                        name_score = fuzzy_name_scores.get(index, 0.0)
                     if name_score > 0:
                         match_details["name"] = {"match_score": name_score}
                 
@@ -267,32 +586,35 @@ class HubSpotClient:
                 
                 # Industry matching with improved handling
                 industry_score = 0.0
-                if "industry" in criteria:
-                    criteria_industry = normalize_industry(criteria["industry"])
+                if criteria_industry is not None:
                     if "industry" in properties and properties["industry"]:
                         try:
                             company_industry = normalize_industry(properties["industry"])
-                            print(f"Comparing industries - Criteria: {criteria_industry}, Company: {company_industry}")
+                            if debug:
+                                logger.debug("Comparing industries - Criteria: %s, Company: %s", criteria_industry, company_industry)
                             if criteria_industry == company_industry:
                                 industry_score = 1.0
-                                print(f"Exact industry match for company {properties.get('name', 'Unknown')}")
+                                if debug:
+                                    logger.debug("Exact industry match for company %s", properties.get('name', 'Unknown'))
                             elif fuzzy_match:
                                 industry_score = self.levenshtein_ratio(criteria_industry, company_industry)
-                                print(f"Fuzzy industry match score: {industry_score}")
+                                if debug:
+                                    logger.debug("Fuzzy industry match score: %s", industry_score)
                             if industry_score > 0:
                                 match_details["industry"] = {"match_score": industry_score}
                         except ValueError:
-                            print(f"Invalid industry format for company {properties.get('name', 'Unknown')}: {properties['industry']}")
-                    else:
-                        print(f"Industry mismatch - Company {properties.get('name', 'Unknown')} - Has industry: {'industry' in properties}, Value: {properties.get('industry')}")
+                            if debug:
+                                logger.debug("Invalid industry format for company %s: %s", properties.get('name', 'Unknown'), properties['industry'])
+                    elif debug:
+                        logger.debug("Industry mismatch - Company %s - Has industry: %s, Value: %s", properties.get('name', 'Unknown'), 'industry' in properties, properties.get('industry'))
                 
                 # Calculate overall score
                 total_score = 0.0
-                weights = {"name": 0.5, "domain": 0.3, "industry": 0.2}
+                weights = _FIND_WEIGHTS
                 total_weight = 0.0
                 
                 # Always include criteria weights in total_weight if they were searched for
-                if "name" in criteria:
+                if criteria_name is not None:
                     if "name" in match_details:
                         total_score += name_score * weights["name"]
                     total_weight += weights["name"]
@@ -300,7 +622,7 @@ class HubSpotClient:
                     if "domain" in match_details:
                         total_score += domain_score * weights["domain"]
                     total_weight += weights["domain"]
-                if "industry" in criteria:
+                if criteria_industry is not None:
                     if "industry" in match_details:
                         total_score += industry_score * weights["industry"]
                     total_weight += weights["industry"]
@@ -316,16 +638,22 @@ class HubSpotClient:
                         "updated_at": company.updated_at.isoformat() if company.updated_at else None,
                         "archived": company.archived
                     }
-                    all_companies.append({
+                    match = {
                         "company": company_dict,
                         "match_score": match_score,
                         "match_details": match_details
-                    })
+                    }
+                    if top_n is None:
+                        all_companies.append(match)
+                    elif len(top_matches) < top_n:
+                        heapq.heappush(top_matches, (match_score, -sequence, match))
+                    elif top_n > 0:
+                        heapq.heappushpop(top_matches, (match_score, -sequence, match))
+                    sequence += 1
                     
-            if not companies_page.paging:
-                break
-            after = companies_page.paging.next.after
-            
+        if top_n is not None:
+            return [match for _, _, match in sorted(top_matches, reverse=True)]
+        
         # Sort by match_score descending
         all_companies.sort(key=lambda x: x["match_score"], reverse=True)
         return all_companies
@@ -351,14 +679,15 @@ class HubSpotClient:
                 company_data["industry"] = normalize_industry(company_data["industry"], test_mode)
             except ValueError as e:
                 raise ValueError(f"Industry validation failed: {str(e)}")
-        # Try to find existing company
-        matches = self.find_companies(company_data, fuzzy_match=fuzzy_match, threshold=match_threshold)
+        # Try to find existing company; the search index could miss one created
+        # moments ago, so always scan the listing
+        matches = self.find_companies(company_data, fuzzy_match=fuzzy_match, threshold=match_threshold, top_n=1, use_search=False)
         
         if matches:
             # Update existing company
             best_match = matches[0]["company"]
             updated = self.client.crm.companies.basic_api.update(
-                company_id=best_match.id,
+                company_id=best_match["id"],
                 simple_public_object_input={"properties": company_data}
             )
             return updated
@@ -387,14 +716,16 @@ class HubSpotClient:
                 properties["industry"] = normalize_industry(properties["industry"], test_mode)
             except ValueError as e:
                 raise ValueError(f"Industry format error: {str(e)}")
-        try:
-            result = self.client.crm.companies.basic_api.update(
-                company_id=company_id,
-                simple_public_object_input={"properties": properties}
-            )
-            return json.dumps({"id": result.id, "properties": result.properties})
-        except Exception as e:
-            return json.dumps({"error": str(e)})
+        return self._send_company_update(company_id, properties)
+
+    @_json_errors
+    def _send_company_update(self, company_id: str, properties: Dict[str, Any]) -> str:
+        """Send an already validated company update; API errors come back as JSON"""
+        result = self.client.crm.companies.basic_api.update(
+            company_id=company_id,
+            simple_public_object_input={"properties": properties}
+        )
+        return _dump({"id": result.id, "properties": result.properties})
 
     def batch_update_companies(self, updates: List[Dict[str, Any]], test_mode: bool = False, allow_custom_industry: bool = False) -> List[Dict[str, Any]]:
         """
@@ -433,47 +764,66 @@ class HubSpotClient:
                 "properties": properties
             })
 
-        # If we have any valid updates, process them in batches of 100
+        # If we have any valid updates, process them in batches of 100, several
+        # batches at a time; map keeps the results in batch order
         if batch_inputs:
-            for i in range(0, len(batch_inputs), 100):
-                batch = batch_inputs[i:i + 100]
+            batches = [batch_inputs[i:i + 100] for i in range(0, len(batch_inputs), 100)]
+            if len(batches) == 1:
+                results.extend(self._update_company_batch(batches[0]))
+            else:
+                workers = min(_BATCH_UPDATE_WORKERS, len(batches))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hubspot-batch-update") as executor:
+                    for batch_results in executor.map(self._update_company_batch, batches):
+                        results.extend(batch_results)
+
+        return results
+
+    def _update_company_batch(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send one batch update request, falling back to per-company updates
+        Args:
+            batch: Up to 100 {id, properties} inputs
+        Returns:
+            List of results with success/error status for each company in the batch
+        """
+        results = []
+        try:
+            batch_result = self.client.crm.companies.batch_api.update(
+                batch_input_simple_public_object_batch_input={"inputs": batch}
+            )
+            for status in batch_result.status:
+                if status.status_code == 200:
+                    results.append({
+                        "company_id": status.id,
+                        "success": True,
+                        "properties": status.properties
+                    })
+                else:
+                    results.append({
+                        "company_id": status.id,
+                        "error": f"Update failed: {status.message}"
+                    })
+        except Exception as e:
+            # If batch fails, try updating companies individually to prevent total failure
+            for company in batch:
                 try:
-                    batch_result = self.client.crm.companies.batch_api.update(
-                        batch_input_simple_public_object_batch_input={"inputs": batch}
+                    result = self.client.crm.companies.basic_api.update(
+                        company_id=company["id"],
+                        simple_public_object_input={"properties": company["properties"]}
                     )
-                    for status in batch_result.status:
-                        if status.status_code == 200:
-                            results.append({
-                                "company_id": status.id,
-                                "success": True,
-                                "properties": status.properties
-                            })
-                        else:
-                            results.append({
-                                "company_id": status.id,
-                                "error": f"Update failed: {status.message}"
-                            })
-                except Exception as e:
-                    # If batch fails, try updating companies individually to prevent total failure
-                    for company in batch:
-                        try:
-                            result = self.client.crm.companies.basic_api.update(
-                                company_id=company["id"],
-                                simple_public_object_input={"properties": company["properties"]}
-                            )
-                            results.append({
-                                "company_id": company["id"],
-                                "success": True,
-                                "properties": result.properties
-                            })
-                        except Exception as inner_e:
-                            results.append({
-                                "company_id": company["id"],
-                                "error": str(inner_e)
-                            })
-
+                    results.append({
+                        "company_id": company["id"],
+                        "success": True,
+                        "properties": result.properties
+                    })
+                except Exception as inner_e:
+                    results.append({
+                        "company_id": company["id"],
+                        "error": str(inner_e)
+                    })
         return results
 
+    @_json_errors
     def create_contact(self, properties: Dict[str, Any]) -> str:
         """
         Create a new contact
@@ -482,24 +832,22 @@ class HubSpotClient:
         Returns:
             JSON string of created contact or error
         """
-        try:
-            # Check if contact exists first
-            email = properties.get("email")
-            if email:
-                filter_groups = [{"filters": [{"propertyName": "email", "operator": "EQ", "value": email}]}]
-                existing = self.client.crm.contacts.search_api.do_search(
-                    public_object_search_request={"filterGroups": filter_groups}
-                )
-                if existing.total > 0:
-                    return json.dumps({"error": f"Contact with email {email} already exists"})
-                    
-            result = self.client.crm.contacts.basic_api.create(
-                simple_public_object_input_for_create={"properties": properties}
+        # Check if contact exists first
+        email = properties.get("email")
+        if email:
+            filter_groups = [{"filters": [{"propertyName": "email", "operator": "EQ", "value": email}]}]
+            existing = self.client.crm.contacts.search_api.do_search(
+                public_object_search_request={"filterGroups": filter_groups}
             )
-            return json.dumps({"id": result.id, "properties": result.properties})
-        except Exception as e:
-            return json.dumps({"error": str(e)})
+            if existing.total > 0:
+                return _dump({"error": f"Contact with email {email} already exists"})
+                
+        result = self.client.crm.contacts.basic_api.create(
+            simple_public_object_input_for_create={"properties": properties}
+        )
+        return _dump({"id": result.id, "properties": result.properties})
 
+    @_json_errors
     def update_contact(self, contact_id: str, properties: Dict[str, Any]) -> str:
         """
         Update an existing contact by ID
@@ -509,15 +857,13 @@ class HubSpotClient:
         Returns:
             JSON string of updated contact or error
         """
-        try:
-            result = self.client.crm.contacts.basic_api.update(
-                contact_id=contact_id,
-                simple_public_object_input={"properties": properties}
-            )
-            return json.dumps({"id": result.id, "properties": result.properties})
-        except Exception as e:
-            return json.dumps({"error": str(e)})
+        result = self.client.crm.contacts.basic_api.update(
+            contact_id=contact_id,
+            simple_public_object_input={"properties": properties}
+        )
+        return _dump({"id": result.id, "properties": result.properties})
 
+    @_json_errors
     def delete_contact(self, contact_id: str) -> str:
         """
         Delete a contact by ID
@@ -526,11 +872,228 @@ class HubSpotClient:
         Returns:
             JSON string indicating success or error
         """
+        self.client.crm.contacts.basic_api.archive(contact_id=contact_id)
+        return _dump({"success": True})
+
+    def batch_update_contacts(self, updates: List[Dict[str, Any]], retry_individually: bool = True) -> List[Optional[str]]:
+        """
+        Update several contacts with one batch request
+        Args:
+            updates: Up to 100 {contact_id, properties} dicts with distinct contact IDs
+            retry_individually: Whether to retry updates the batch did not apply
+                one request at a time; if False they are returned as None
+        Returns:
+            JSON string per update, in input order, as update_contact would return it
+        """
         try:
-            self.client.crm.contacts.basic_api.archive(contact_id=contact_id)
-            return json.dumps({"success": True})
-        except Exception as e:
-            return json.dumps({"error": str(e)})
+            batch_result = self.client.crm.contacts.batch_api.update(
+                batch_input_simple_public_object_batch_input={"inputs": [
+                    {"id": update["contact_id"], "properties": update["properties"]} for update in updates
+                ]}
+            )
+            updated = {result.id: result for result in batch_result.results}
+        except Exception:
+            updated = {}
+
+        # Anything the batch did not update is retried on its own so it gets its own error
+        results = []
+        for update in updates:
+            result = updated.get(update["contact_id"])
+            if result is not None:
+                results.append(_dump({"id": result.id, "properties": result.properties}))
+            elif retry_individually:
+                results.append(self.update_contact(update["contact_id"], update["properties"]))
+            else:
+                results.append(None)
+        return results
+
+    def batch_delete_contacts(self, contact_ids: List[str], retry_individually: bool = True) -> List[Optional[str]]:
+        """
+        Delete several contacts with one batch request
+        Args:
+            contact_ids: Up to 100 HubSpot contact IDs
+            retry_individually: Whether to retry each delete on its own if the
+                batch fails; if False they are returned as None
+        Returns:
+            JSON string per contact, in input order, as delete_contact would return it
+        """
+        try:
+            self.client.crm.contacts.batch_api.archive(
+                batch_input_simple_public_object_id={"inputs": [{"id": contact_id} for contact_id in contact_ids]}
+            )
+        except Exception:
+            if not retry_individually:
+                return [None] * len(contact_ids)
+            # If batch fails, delete contacts individually to report errors per contact
+            return [self.delete_contact(contact_id) for contact_id in contact_ids]
+        return [_dump({"success": True})] * len(contact_ids)
+
+# Tool listing is static, so it is built once and returned for every request
+_LIST_TOOLS_RESPONSE = {
+    "tools": [
+        {
+            "name": "find_companies",
+            "description": "Find companies matching given criteria with fuzzy matching support",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "criteria": {
+                        "type": "object",
+                        "description": "Company properties to match against (name, domain, industry, etc)",
+                    },
+                    "fuzzy_match": {
+                        "type": "boolean",
+                        "description": "Whether to use fuzzy string matching",
+                        "default": True
+                    },
+                    "threshold": {
+                        "type": "number",
+                        "description": "Minimum match score (0.0 to 1.0)",
+                        "default": 0.7
+                    }
+                },
+                "required": ["criteria"]
+            }
+        },
+        {
+            "name": "create_or_update_company",
+            "description": "Create a new company or update if matching company found",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "company_data": {
+                        "type": "object",
+                        "description": "Company properties"
+                    },
+                    "fuzzy_match": {
+                        "type": "boolean",
+                        "description": "Whether to use fuzzy matching to find existing",
+                        "default": True
+                    },
+                    "match_threshold": {
+                        "type": "number",
+                        "description": "Minimum score to consider a match",
+                        "default": 0.8
+                    },
+                    "test_mode": {
+                        "type": "boolean",
+                        "description": "Whether to use test subset of industries",
+                        "default": False
+                    }
+                },
+                "required": ["company_data"]
+            }
+        },
+        {
+            "name": "update_company",
+            "description": "Update an existing company by ID",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "company_id": {
+                        "type": "string",
+                        "description": "HubSpot company ID"
+                    },
+                    "properties": {
+                        "type": "object",
+                        "description": "Company properties to update"
+                    },
+                    "test_mode": {
+                        "type": "boolean",
+                        "description": "Whether to use test subset of industries",
+                        "default": False
+                    }
+                },
+                "required": ["company_id", "properties"]
+            }
+        },
+        {
+            "name": "create_contact",
+            "description": "Create a new contact",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "properties": {
+                        "type": "object",
+                        "description": "Contact properties"
+                    }
+                },
+                "required": ["properties"]
+            }
+        },
+        {
+            "name": "update_contact",
+            "description": "Update an existing contact by ID",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "contact_id": {
+                        "type": "string",
+                        "description": "HubSpot contact ID"
+                    },
+                    "properties": {
+                        "type": "object",
+                        "description": "Contact properties to update"
+                    }
+                },
+                "required": ["contact_id", "properties"]
+            }
+        },
+        {
+            "name": "delete_contact",
+            "description": "Delete a contact by ID",
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "contact_id": {
+                        "type": "string",
+                        "description": "HubSpot contact ID"
+                    }
+                },
+                "required": ["contact_id"]
+            }
+        }
+    ]
+}
+
+# JSON schema types used by the tool input schemas above
+_SCHEMA_TYPES = {
+    "object": dict,
+    "string": str,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+def _build_arg_spec(schema: Dict[str, Any]) -> tuple:
+    """Precompute (required names, defaults, schema types) from a tool input schema"""
+    properties = schema.get("properties", {})
+    defaults = {name: prop["default"] for name, prop in properties.items() if "default" in prop}
+    types = {name: prop["type"] for name, prop in properties.items() if prop.get("type") in _SCHEMA_TYPES}
+    return tuple(schema.get("required", ())), defaults, types
+
+_TOOL_ARG_SPECS = {tool["name"]: _build_arg_spec(tool["inputSchema"]) for tool in _LIST_TOOLS_RESPONSE["tools"]}
+
+def _validate_args(tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check tool arguments against the tool's input schema and fill in defaults
+    Args:
+        tool_name: Name of a listed tool
+        args: Arguments from the tool call
+    Returns:
+        New dict of arguments with schema defaults for any omitted optional ones
+    """
+    required, defaults, types = _TOOL_ARG_SPECS[tool_name]
+    missing = [name for name in required if name not in args]
+    if missing:
+        raise ValueError(f"Missing required argument(s) for {tool_name}: {', '.join(missing)}")
+    for name, value in args.items():
+        schema_type = types.get(name)
+        if schema_type is None:
+            continue
+        # bool is an int subclass, so it would otherwise pass as a number
+        if not isinstance(value, _SCHEMA_TYPES[schema_type]) or (schema_type != "boolean" and isinstance(value, bool)):
+            raise ValueError(f"Invalid argument for {tool_name}: {name} must be of type {schema_type}")
+    return {**defaults, **args}
 
 class Server:
     """MCP Server implementation for HubSpot integration"""
@@ -553,6 +1116,34 @@ class Server:
             }
         )
         
+        self._limiter = _RateLimiter(_RATE_LIMIT_REQUESTS, _RATE_LIMIT_PERIOD)
+        # Blocking HubSpot calls get their own bounded pool rather than
+        # sharing asyncio's default executor
+        self._pool = ThreadPoolExecutor(max_workers=_HUBSPOT_WORKERS, thread_name_prefix="hubspot")
+        
+        # Serialized find_companies responses; the generation is bumped on every
+        # company write so a search that overlapped the write isn't cached
+        self._find_cache = _TTLCache(_FIND_CACHE_SIZE, _FIND_CACHE_TTL)
+        self._find_cache_generation = 0
+        # Searches currently running, by cache key, so identical concurrent
+        # calls make one HubSpot scan between them
+        self._find_inflight = {}
+        
+        # Queued (operation, payload, future) contact writes, sent in batches
+        # by a worker started on first use
+        self._contact_ops = asyncio.Queue()
+        self._contact_worker = None
+        
+        # Tool name -> handler coroutine, looked up by handle_call_tool
+        self._tool_handlers = {
+            "find_companies": self._handle_find_companies,
+            "create_or_update_company": self._handle_create_or_update_company,
+            "update_company": self._handle_update_company,
+            "create_contact": self._handle_create_contact,
+            "update_contact": self._handle_update_contact,
+            "delete_contact": self._handle_delete_contact,
+        }
+        
         self.setup_tool_handlers()
         
         # Error handling
@@ -566,211 +1157,179 @@ class Server:
         
     async def handle_list_tools(self, request):
         """Handle listing available tools"""
-        return {
-            "tools": [
-                {
-                    "name": "find_companies",
-                    "description": "Find companies matching given criteria with fuzzy matching support",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "criteria": {
-                                "type": "object",
-                                "description": "Company properties to match against (name, domain, industry, etc)",
-                            },
-                            "fuzzy_match": {
-                                "type": "boolean",
-                                "description": "Whether to use fuzzy string matching",
-                                "default": True
-                            },
-                            "threshold": {
-                                "type": "number",
-                                "description": "Minimum match score (0.0 to 1.0)",
-                                "default": 0.7
-                            }
-                        },
-                        "required": ["criteria"]
-                    }
-                },
-                {
-                    "name": "create_or_update_company",
-                    "description": "Create a new company or update if matching company found",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "company_data": {
-                                "type": "object",
-                                "description": "Company properties"
-                            },
-                            "fuzzy_match": {
-                                "type": "boolean",
-                                "description": "Whether to use fuzzy matching to find existing",
-                                "default": True
-                            },
-                            "match_threshold": {
-                                "type": "number",
-                                "description": "Minimum score to consider a match",
-                                "default": 0.8
-                            },
-                            "test_mode": {
-                                "type": "boolean",
-                                "description": "Whether to use test subset of industries",
-                                "default": False
-                            }
-                        },
-                        "required": ["company_data"]
-                    }
-                },
-                {
-                    "name": "update_company",
-                    "description": "Update an existing company by ID",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "company_id": {
-                                "type": "string",
-                                "description": "HubSpot company ID"
-                            },
-                            "properties": {
-                                "type": "object",
-                                "description": "Company properties to update"
-                            },
-                            "test_mode": {
-                                "type": "boolean",
-                                "description": "Whether to use test subset of industries",
-                                "default": False
-                            }
-                        },
-                        "required": ["company_id", "properties"]
-                    }
-                },
-                {
-                    "name": "create_contact",
-                    "description": "Create a new contact",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "properties": {
-                                "type": "object",
-                                "description": "Contact properties"
-                            }
-                        },
-                        "required": ["properties"]
-                    }
-                },
-                {
-                    "name": "update_contact",
-                    "description": "Update an existing contact by ID",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "contact_id": {
-                                "type": "string",
-                                "description": "HubSpot contact ID"
-                            },
-                            "properties": {
-                                "type": "object",
-                                "description": "Contact properties to update"
-                            }
-                        },
-                        "required": ["contact_id", "properties"]
-                    }
-                },
-                {
-                    "name": "delete_contact",
-                    "description": "Delete a contact by ID",
-                    "inputSchema": {
-                        "type": "object",
-                        "properties": {
-                            "contact_id": {
-                                "type": "string",
-                                "description": "HubSpot contact ID"
-                            }
-                        },
-                        "required": ["contact_id"]
-                    }
-                }
-            ]
-        }
+        return _LIST_TOOLS_RESPONSE
         
     async def handle_call_tool(self, request):
-        """Handle tool execution requests"""
-        try:
-            tool_name = request.params.name
-            args = request.params.arguments
+        """
+        Handle tool execution requests
+        HubSpot calls block, so handlers run them in worker threads to leave
+        the event loop free to serve other requests in the meantime
+        """
+        params = request.params
+        tool_name = params.name
+        args = params.arguments
+        # Handlers index plain dicts; convert model arguments once up front
+        if args is None:
+            args = {}
+        elif not isinstance(args, dict):
+            args = args.model_dump()
+        
+        handler = self._tool_handlers.get(tool_name)
+        if handler is None:
+            raise Exception(f"Unknown tool: {tool_name}")
+        # Reject bad arguments before any HubSpot call and fill in defaults
+        return await handler(_validate_args(tool_name, args))
             
-            if tool_name == "find_companies":
-                result = self.hubspot.find_companies(
-                    args["criteria"],
-                    args.get("fuzzy_match", True),
-                    args.get("threshold", 0.7)
-                )
-                # Convert each company object to a serializable dict
-                serializable_result = []
-                for item in result:
-                    company_dict = item["company"]
-                    serializable_result.append({
-                        "company": company_dict,
-                        "match_score": item["match_score"],
-                        "match_details": item["match_details"]
-                    })
-                return {"content": [{"type": "text", "text": json.dumps(serializable_result, indent=2)}]}
-                
-            elif tool_name == "create_or_update_company":
-                result = self.hubspot.create_or_update_company(
-                    args["company_data"],
-                    args.get("fuzzy_match", True),
-                    args.get("match_threshold", 0.8),
-                    args.get("test_mode", False)
-                )
-                # Convert company object to a serializable dict
-                result_dict = {
-                    "id": result.id,
-                    "properties": result.properties,
-                    "created_at": result.created_at.isoformat() if result.created_at else None,
-                    "updated_at": result.updated_at.isoformat() if result.updated_at else None,
-                    "archived": result.archived
-                }
-                return {"content": [{"type": "text", "text": json.dumps(result_dict, indent=2)}]}
-                
-            elif tool_name == "update_company":
-                result = self.hubspot.update_company(
-                    args["company_id"],
-                    args["properties"],
-                    args.get("test_mode", False)
-                )
-                return {"content": [{"type": "text", "text": result}]}
-                
-            elif tool_name == "create_contact":
-                result = self.hubspot.create_contact(args["properties"])
-                return {"content": [{"type": "text", "text": result}]}
-                
-            elif tool_name == "update_contact":
-                result = self.hubspot.update_contact(
-                    args["contact_id"],
-                    args["properties"]
-                )
-                return {"content": [{"type": "text", "text": result}]}
-                
-            elif tool_name == "delete_contact":
-                result = self.hubspot.delete_contact(args["contact_id"])
-                return {"content": [{"type": "text", "text": result}]}
-                
+    async def _handle_find_companies(self, args):
+        fuzzy_match = args["fuzzy_match"]
+        threshold = args["threshold"]
+        cache_key = (json.dumps(args["criteria"], sort_keys=True, separators=(",", ":")), fuzzy_match, threshold)
+        text = self._find_cache.get(cache_key)
+        if text is None:
+            search = self._find_inflight.get(cache_key)
+            if search is None:
+                # The search runs as its own task, shared by every identical
+                # call until it finishes; callers wait on it through shield so
+                # one of them being cancelled doesn't cancel it for the rest
+                search = asyncio.ensure_future(self._run_find_companies(cache_key, args["criteria"], fuzzy_match, threshold))
+                # Mark an error as retrieved so one nobody waited on isn't logged
+                search.add_done_callback(lambda task: task.cancelled() or task.exception())
+                self._find_inflight[cache_key] = search
+            text = await asyncio.shield(search)
+        return {"content": [{"type": "text", "text": text}]}
+        
+    async def _run_find_companies(self, cache_key: tuple, criteria: Dict[str, Any], fuzzy_match: bool, threshold: float) -> str:
+        """Run a search and cache its serialized result unless a company write overlapped it"""
+        task = asyncio.current_task()
+        try:
+            generation = self._find_cache_generation
+            result = await self._call_hubspot(self.hubspot.find_companies, criteria, fuzzy_match, threshold)
+            # Matches already hold plain dicts, so serialize them as they are
+            text = _dump(result)
+            if generation == self._find_cache_generation:
+                self._find_cache.set(cache_key, text)
+            return text
+        finally:
+            if self._find_inflight.get(cache_key) is task:
+                del self._find_inflight[cache_key]
+        
+    async def _handle_create_or_update_company(self, args):
+        result = await self._call_hubspot(
+            self.hubspot.create_or_update_company,
+            args["company_data"],
+            args["fuzzy_match"],
+            args["match_threshold"],
+            args["test_mode"]
+        )
+        self._invalidate_find_cache()
+        return {"content": [{"type": "text", "text": _dump(result)}]}
+        
+    async def _handle_update_company(self, args):
+        result = await self._call_hubspot(
+            self.hubspot.update_company,
+            args["company_id"],
+            args["properties"],
+            args["test_mode"]
+        )
+        self._invalidate_find_cache()
+        return {"content": [{"type": "text", "text": result}]}
+        
+    async def _handle_create_contact(self, args):
+        result = await self._call_hubspot(self.hubspot.create_contact, args["properties"])
+        return {"content": [{"type": "text", "text": result}]}
+        
+    async def _handle_update_contact(self, args):
+        result = await self._queue_contact_op("update", {
+            "contact_id": args["contact_id"],
+            "properties": args["properties"]
+        })
+        return {"content": [{"type": "text", "text": result}]}
+        
+    async def _handle_delete_contact(self, args):
+        result = await self._queue_contact_op("delete", {"contact_id": args["contact_id"]})
+        return {"content": [{"type": "text", "text": result}]}
+        
+    async def _call_hubspot(self, method, *args):
+        """Run a blocking HubSpotClient method in a worker thread, once the tool call rate limit allows"""
+        async with self._limiter:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, functools.partial(method, *args))
+
+    def _invalidate_find_cache(self):
+        """Drop cached searches after a company write"""
+        self._find_cache_generation += 1
+        self._find_cache.clear()
+        # Searches started before the write may be stale; later ones start fresh
+        self._find_inflight.clear()
+
+    async def _queue_contact_op(self, operation: str, payload: Dict[str, Any]) -> str:
+        """Queue a contact update/delete for the next batch and wait for its result"""
+        if self._contact_worker is None or self._contact_worker.done():
+            self._contact_worker = asyncio.create_task(self._process_contact_ops())
+        future = asyncio.get_running_loop().create_future()
+        self._contact_ops.put_nowait((operation, payload, future))
+        return await future
+
+    async def _process_contact_ops(self):
+        """Drain queued contact writes into HubSpot batch requests"""
+        while True:
+            pending = [await self._contact_ops.get()]
+            # Give concurrent requests a moment to join this batch
+            await asyncio.sleep(_CONTACT_BATCH_WINDOW)
+            while len(pending) < _CONTACT_BATCH_SIZE and not self._contact_ops.empty():
+                pending.append(self._contact_ops.get_nowait())
+
+            # Send runs of the same operation together, in arrival order, so an
+            # update followed by a delete of the same contact still happens in
+            # that order; a repeated contact ID also starts a new batch
+            batch = []
+            batch_ids = set()
+            for item in pending:
+                operation, payload, _ = item
+                if batch and (operation != batch[0][0] or payload["contact_id"] in batch_ids):
+                    await self._send_contact_batch(batch)
+                    batch = []
+                    batch_ids.clear()
+                batch.append(item)
+                batch_ids.add(payload["contact_id"])
+            await self._send_contact_batch(batch)
+
+    async def _send_contact_batch(self, batch: List[Any]):
+        """Send one batch of same-operation contact writes and resolve their futures"""
+        payloads = [payload for _, payload, _ in batch]
+        try:
+            if batch[0][0] == "update":
+                results = await self._call_hubspot(self.hubspot.batch_update_contacts, payloads, False)
+                retry = lambda payload: self._call_hubspot(self.hubspot.update_contact, payload["contact_id"], payload["properties"])
             else:
-                raise Exception(f"Unknown tool: {tool_name}")
-                
+                results = await self._call_hubspot(self.hubspot.batch_delete_contacts, [payload["contact_id"] for payload in payloads], False)
+                retry = lambda payload: self._call_hubspot(self.hubspot.delete_contact, payload["contact_id"])
+            # Writes the batch did not apply are retried individually, each as
+            # its own rate-limited call, so each gets its own error
+            failed = [index for index, result in enumerate(results) if result is None]
+            if failed:
+                retried = await asyncio.gather(*(retry(payloads[index]) for index in failed))
+                for index, result in zip(failed, retried):
+                    results[index] = result
         except Exception as e:
-            raise Exception(str(e))
-            
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
     async def run(self):
         """Run the MCP server"""
         async with stdio_server(self.server) as server:
             print("HubSpot MCP server running on stdio", file=sys.stderr)
             await server.serve_forever()
 
+def _run_event_loop(main) -> Any:
+    """Run a coroutine to completion, on uvloop's libuv-based event loop when it is installed"""
+    run = uvloop.run if uvloop is not None else asyncio.run
+    return run(main)
+
 if __name__ == "__main__":
-    import sys
-    import asyncio
-    
     server = Server()
-    asyncio.run(server.run())
+    _run_event_loop(server.run())
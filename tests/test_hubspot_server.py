@@ -1,6 +1,14 @@
 import pytest
+import pytest_asyncio
+import asyncio
 import json
-import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ReadTimeoutError
+from mcp_server_hubspot import server as server_module
 from mcp_server_hubspot.server import HubSpotClient, Server
 from mcp_server_hubspot.industries import normalize_industry, is_valid_industry
 from mcp.types import CallToolRequest, ListToolsRequest
@@ -12,51 +20,71 @@ from tests.test_data import (
     SEARCH_CRITERIA
 )
 
-@pytest.fixture
-async def hubspot_client(hubspot_token):
-    """Fixture to create a HubSpot client instance"""
+@pytest.fixture(scope="session")
+def hubspot_test_companies(hubspot_token):
+    """Fixture to create the test companies once for the whole session, mapping each ID to its original properties"""
     client = HubSpotClient(hubspot_token)
     
-    # Create test companies
-    company_ids = []
-    for company in TEST_COMPANIES:
-        try:
-            result = client.client.crm.companies.basic_api.create(
-                simple_public_object_input_for_create={"properties": company["properties"]}
-            )
-            company_ids.append(result.id)
-            print(f"Created test company: {company['properties']['name']} with ID: {result.id}")
-        except Exception as e:
-            print(f"Error creating test company {company['properties']['name']}: {str(e)}")
+    # Create test companies in a single batch request; results aren't
+    # guaranteed to come back in input order, so match them up by name
+    companies = {}
+    try:
+        result = client.client.crm.companies.batch_api.create(
+            batch_input_simple_public_object_batch_input_for_create={
+                "inputs": [{"properties": company["properties"]} for company in TEST_COMPANIES]
+            }
+        )
+        originals = {company["properties"]["name"]: company["properties"] for company in TEST_COMPANIES}
+        companies = {company.id: originals[company.properties["name"]] for company in result.results}
+        print(f"Created test companies with IDs: {list(companies)}")
+    except Exception as e:
+        print(f"Error creating test companies: {str(e)}")
     
+    company_ids = list(companies)
     try:
-        yield client
+        yield companies
     finally:
-        # Clean up test companies
-        for company_id in company_ids:
+        # Clean up test companies in a single batch request
+        if company_ids:
             try:
-                client.client.crm.companies.basic_api.archive(company_id=company_id)
-                print(f"Cleaned up test company with ID: {company_id}")
+                client.client.crm.companies.batch_api.archive(
+                    batch_input_simple_public_object_id={"inputs": [{"id": company_id} for company_id in company_ids]}
+                )
+                print(f"Cleaned up test companies with IDs: {company_ids}")
             except Exception as e:
-                print(f"Error cleaning up company {company_id}: {str(e)}")
+                print(f"Error cleaning up companies {company_ids}: {str(e)}")
 
 @pytest.fixture
-async def mcp_server(hubspot_token):
-    """Fixture to create an MCP Server instance"""
-    os.environ["HUBSPOT_API_KEY"] = hubspot_token
-    server = Server()
+def hubspot_client(hubspot_test_companies, hubspot_token):
+    """Fixture to create a HubSpot client instance for tests that only read the test companies"""
+    return HubSpotClient(hubspot_token)
+
+@pytest.fixture
+def mutable_hubspot_client(hubspot_client, hubspot_test_companies):
+    """Fixture for tests that modify the test companies; restores their original properties afterwards"""
     try:
-        yield server
+        yield hubspot_client
     finally:
-        del os.environ["HUBSPOT_API_KEY"]
+        if hubspot_test_companies:
+            hubspot_client.client.crm.companies.batch_api.update(
+                batch_input_simple_public_object_batch_input={"inputs": [
+                    {"id": company_id, "properties": properties}
+                    for company_id, properties in hubspot_test_companies.items()
+                ]}
+            )
+
+@pytest.fixture
+def mcp_server(hubspot_test_companies, hubspot_token, monkeypatch):
+    """Fixture to create an MCP Server instance"""
+    monkeypatch.setenv("HUBSPOT_API_KEY", hubspot_token)
+    return Server()
 
 # HubSpotClient Tests
 
 @pytest.mark.asyncio
 async def test_find_companies_exact_name(hubspot_client):
     """Test finding companies by exact name match"""
-    client = await hubspot_client.__anext__()
-    results = client.find_companies(SEARCH_CRITERIA["exact_name"])
+    results = hubspot_client.find_companies(SEARCH_CRITERIA["exact_name"])
     
     assert len(results) >= 1, "Should find at least one company"
     best_match = results[0]
@@ -67,8 +95,7 @@ async def test_find_companies_exact_name(hubspot_client):
 @pytest.mark.asyncio
 async def test_find_companies_fuzzy_name(hubspot_client):
     """Test finding companies with fuzzy name matching"""
-    client = await hubspot_client.__anext__()
-    results = client.find_companies(SEARCH_CRITERIA["fuzzy_name"])
+    results = hubspot_client.find_companies(SEARCH_CRITERIA["fuzzy_name"])
     
     assert len(results) >= 1, "Should find at least one company"
     best_match = results[0]
@@ -79,8 +106,7 @@ async def test_find_companies_fuzzy_name(hubspot_client):
 @pytest.mark.asyncio
 async def test_find_companies_domain(hubspot_client):
     """Test finding companies by domain"""
-    client = await hubspot_client.__anext__()
-    results = client.find_companies(SEARCH_CRITERIA["domain"])
+    results = hubspot_client.find_companies(SEARCH_CRITERIA["domain"])
     
     assert len(results) >= 1, "Should find at least one company"
     best_match = results[0]
@@ -90,8 +116,7 @@ async def test_find_companies_domain(hubspot_client):
 @pytest.mark.asyncio
 async def test_find_companies_industry(hubspot_client):
     """Test finding companies by industry"""
-    client = await hubspot_client.__anext__()
-    results = client.find_companies(SEARCH_CRITERIA["industry"])
+    results = hubspot_client.find_companies(SEARCH_CRITERIA["industry"])
     
     assert len(results) >= 1, "Should find companies with matching industry"
     for result in results[:1]:
@@ -101,8 +126,7 @@ async def test_find_companies_industry(hubspot_client):
 @pytest.mark.asyncio
 async def test_find_companies_multiple_criteria(hubspot_client):
     """Test finding companies with multiple search criteria"""
-    client = await hubspot_client.__anext__()
-    results = client.find_companies(SEARCH_CRITERIA["multiple_fields"])
+    results = hubspot_client.find_companies(SEARCH_CRITERIA["multiple_fields"])
     
     assert len(results) >= 1, "Should find Acme companies with matching industry"
     for result in results[:1]:
@@ -114,8 +138,7 @@ async def test_find_companies_multiple_criteria(hubspot_client):
 @pytest.mark.asyncio
 async def test_find_companies_no_matches(hubspot_client):
     """Test finding companies with criteria that should return no matches"""
-    client = await hubspot_client.__anext__()
-    results = client.find_companies({
+    results = hubspot_client.find_companies({
         "name": "Nonexistent Company XYZ",
         "domain": "nonexistent.com"
     })
@@ -123,18 +146,17 @@ async def test_find_companies_no_matches(hubspot_client):
     assert len(results) == 0, "Should not find any matches"
 
 @pytest.mark.asyncio
-async def test_update_company(hubspot_client):
+async def test_update_company(mutable_hubspot_client):
     """Test updating a company's properties"""
-    client = await hubspot_client.__anext__()
     # First find the company to update
-    results = client.find_companies({"name": "Acme Corporation"})
+    results = mutable_hubspot_client.find_companies({"name": "Acme Corporation"})
     assert len(results) > 0, "Test company should exist"
     
     company_id = results[0]["company"]["id"]
     
     try:
         # Update the company
-        update_result = json.loads(client.update_company(
+        update_result = json.loads(mutable_hubspot_client.update_company(
             company_id=company_id,
             properties=UPDATED_COMPANY["properties"]
         ))
@@ -155,8 +177,7 @@ async def test_update_company(hubspot_client):
 @pytest.mark.asyncio
 async def test_update_company_invalid_id(hubspot_client):
     """Test updating a company with an invalid ID"""
-    client = await hubspot_client.__anext__()
-    result = json.loads(client.update_company(
+    result = json.loads(hubspot_client.update_company(
         company_id="invalid_id",
         properties=UPDATED_COMPANY["properties"]
     ))
@@ -166,9 +187,8 @@ async def test_update_company_invalid_id(hubspot_client):
 @pytest.mark.asyncio
 async def test_update_contact(hubspot_client):
     """Test updating a contact through the HubSpot API using test data"""
-    client = await hubspot_client.__anext__()
     # Create a test contact
-    create_result = client.create_contact(TEST_CONTACT["properties"])
+    create_result = hubspot_client.create_contact(TEST_CONTACT["properties"])
     create_response = json.loads(create_result)
     assert "error" not in create_response, f"Create failed: {create_response.get('error')}"
     
@@ -176,7 +196,7 @@ async def test_update_contact(hubspot_client):
     
     try:
         # Update the test contact
-        update_result = client.update_contact(
+        update_result = hubspot_client.update_contact(
             contact_id=contact_id,
             properties=UPDATED_CONTACT["properties"]
         )
@@ -192,15 +212,14 @@ async def test_update_contact(hubspot_client):
             
     finally:
         # Clean up - delete the test contact
-        delete_result = client.delete_contact(contact_id)
+        delete_result = hubspot_client.delete_contact(contact_id)
         delete_response = json.loads(delete_result)
         assert "error" not in delete_response, f"Delete failed: {delete_response.get('error')}"
 
 @pytest.mark.asyncio
 async def test_update_contact_invalid_id(hubspot_client):
     """Test updating a contact with an invalid ID"""
-    client = await hubspot_client.__anext__()
-    result = client.update_contact(
+    result = hubspot_client.update_contact(
         contact_id="invalid_id",
         properties={
             "firstname": "Test",
@@ -216,16 +235,14 @@ async def test_update_contact_invalid_id(hubspot_client):
 @pytest.mark.asyncio
 async def test_mcp_server_initialization(mcp_server):
     """Test MCP server initialization"""
-    server = await mcp_server.__anext__()
-    assert server.hubspot is not None, "HubSpot client should be initialized"
-    assert server.server is not None, "MCP server should be initialized"
+    assert mcp_server.hubspot is not None, "HubSpot client should be initialized"
+    assert mcp_server.server is not None, "MCP server should be initialized"
 
 @pytest.mark.asyncio
 async def test_mcp_list_tools(mcp_server):
     """Test listing available MCP tools"""
-    server = await mcp_server.__anext__()
     request = ListToolsRequest(method="tools/list", params={})
-    response = await server.handle_list_tools(request)
+    response = await mcp_server.handle_list_tools(request)
     
     assert "tools" in response
     tools = response["tools"]
@@ -253,7 +270,6 @@ async def test_mcp_list_tools(mcp_server):
 @pytest.mark.asyncio
 async def test_mcp_find_companies(mcp_server):
     """Test find_companies tool"""
-    server = await mcp_server.__anext__()
     request = CallToolRequest(method="tools/call", params={
         "name": "find_companies",
         "arguments": {
@@ -263,7 +279,7 @@ async def test_mcp_find_companies(mcp_server):
         }
     })
     
-    response = await server.handle_call_tool(request)
+    response = await mcp_server.handle_call_tool(request)
     assert "content" in response
     assert len(response["content"]) == 1
     
@@ -274,7 +290,6 @@ async def test_mcp_find_companies(mcp_server):
 @pytest.mark.asyncio
 async def test_mcp_create_contact(mcp_server):
     """Test create_contact tool"""
-    server = await mcp_server.__anext__()
     request = CallToolRequest(method="tools/call", params={
         "name": "create_contact",
         "arguments": {
@@ -282,7 +297,7 @@ async def test_mcp_create_contact(mcp_server):
         }
     })
     
-    response = await server.handle_call_tool(request)
+    response = await mcp_server.handle_call_tool(request)
     assert "content" in response
     assert len(response["content"]) == 1
     
@@ -297,7 +312,7 @@ async def test_mcp_create_contact(mcp_server):
             "contact_id": result["id"]
         }
     })
-    delete_response = await server.handle_call_tool(delete_request)
+    delete_response = await mcp_server.handle_call_tool(delete_request)
     delete_result = json.loads(delete_response["content"][0]["text"])
     assert delete_result["success"] is True
 
@@ -364,6 +379,20 @@ async def test_industry_normalization():
     assert normalize_industry("Computer-Software", test_mode=False) == "COMPUTER_SOFTWARE"
     assert normalize_industry("Computer - Software", test_mode=False) == "COMPUTER_SOFTWARE"
     assert normalize_industry(" Computer Software ", test_mode=False) == "COMPUTER_SOFTWARE"
+    
+    # Test tabs and newlines act as separators like spaces
+    assert normalize_industry("Computer\tSoftware", test_mode=False) == "COMPUTER_SOFTWARE"
+    assert normalize_industry("Computer\nSoftware", test_mode=False) == "COMPUTER_SOFTWARE"
+    assert normalize_industry("Computer \t\r\n Software", test_mode=False) == "COMPUTER_SOFTWARE"
+    assert is_valid_industry("Computer\tSoftware", test_mode=False)
+    
+    # Test non-ASCII values are rejected, since V3 industries are ASCII only
+    with pytest.raises(ValueError) as exc_info:
+        normalize_industry("Café", test_mode=False)
+    assert "V3 API format" in str(exc_info.value)
+    with pytest.raises(ValueError):
+        normalize_industry("COMPUTER_SOFTWARÉ", test_mode=False)
+    assert not is_valid_industry("Café", test_mode=False, allow_custom=True)
 
 @pytest.mark.asyncio
 async def test_industry_normalization_test_mode():
@@ -382,10 +411,43 @@ async def test_industry_normalization_test_mode():
     assert normalize_industry("E-Commerce", test_mode=True) == "E_COMMERCE"
     assert normalize_industry(" Financial Services ", test_mode=True) == "FINANCIAL_SERVICES"
 
+@pytest.mark.asyncio
+async def test_tool_argument_validation():
+    """Test tool arguments are checked against the tool input schemas"""
+    validate_args = server_module._validate_args
+    
+    # Test defaults are filled in for omitted optional arguments
+    args = validate_args("find_companies", {"criteria": {"name": "Acme"}})
+    assert args == {"criteria": {"name": "Acme"}, "fuzzy_match": True, "threshold": 0.7}
+    
+    # Test given arguments take precedence over defaults
+    args = validate_args("find_companies", {"criteria": {}, "fuzzy_match": False, "threshold": 1})
+    assert args["fuzzy_match"] is False
+    assert args["threshold"] == 1
+    
+    # Test missing required arguments
+    with pytest.raises(ValueError) as exc_info:
+        validate_args("update_company", {"properties": {}})
+    assert "Missing required argument(s) for update_company: company_id" in str(exc_info.value)
+    
+    # Test wrong types, including bool where a number is expected
+    with pytest.raises(ValueError) as exc_info:
+        validate_args("find_companies", {"criteria": {}, "threshold": True})
+    assert "threshold must be of type number" in str(exc_info.value)
+    with pytest.raises(ValueError) as exc_info:
+        validate_args("delete_contact", {"contact_id": 123})
+    assert "contact_id must be of type string" in str(exc_info.value)
+    with pytest.raises(ValueError) as exc_info:
+        validate_args("create_contact", {"properties": "email=test@example.com"})
+    assert "properties must be of type object" in str(exc_info.value)
+    
+    # Test arguments outside the schema are passed through unchecked
+    args = validate_args("delete_contact", {"contact_id": "1", "extra": 1})
+    assert args == {"contact_id": "1", "extra": 1}
+
 @pytest.mark.asyncio
 async def test_create_company_with_invalid_industry(hubspot_client):
     """Test creating a company with an invalid industry"""
-    client = await hubspot_client.__anext__()
     
     # Test invalid industry
     invalid_company = {
@@ -394,7 +456,7 @@ async def test_create_company_with_invalid_industry(hubspot_client):
         "industry": "INVALID_INDUSTRY"
     }
     with pytest.raises(ValueError) as exc_info:
-        client.create_or_update_company(invalid_company)
+        hubspot_client.create_or_update_company(invalid_company)
     assert "Invalid industry" in str(exc_info.value)
     
     # Test case sensitivity
@@ -404,7 +466,7 @@ async def test_create_company_with_invalid_industry(hubspot_client):
         "industry": "Computer-Software"
     }
     with pytest.raises(ValueError) as exc_info:
-        client.create_or_update_company(mixed_case_company)
+        hubspot_client.create_or_update_company(mixed_case_company)
     assert "must be uppercase" in str(exc_info.value)
     
     # Test custom industry allowed
@@ -414,7 +476,7 @@ async def test_create_company_with_invalid_industry(hubspot_client):
         "industry": "CUSTOM_INDUSTRY_VALUE"
     }
     try:
-        result = client.create_or_update_company(custom_company, allow_custom_industry=True)
+        result = hubspot_client.create_or_update_company(custom_company, allow_custom_industry=True)
         assert result.properties["industry"] == "CUSTOM_INDUSTRY_VALUE"
     except ValueError:
         pytest.fail("Should allow custom industry when allow_custom_industry=True")
@@ -422,18 +484,19 @@ async def test_create_company_with_invalid_industry(hubspot_client):
 @pytest.mark.asyncio
 async def test_batch_update_companies(hubspot_client):
     """Test batch updating companies"""
-    client = await hubspot_client.__anext__()
     
-    # Create test companies
-    companies = []
-    for i in range(3):
-        company = {
+    # Create test companies concurrently; they don't depend on each other
+    company_data = [
+        {
             "name": f"Test Company {i}",
             "domain": f"test{i}.com",
             "industry": "COMPUTER_SOFTWARE"
         }
-        result = client.create_or_update_company(company)
-        companies.append({"id": result.id, "properties": result.properties})
+        for i in range(3)
+    ]
+    with ThreadPoolExecutor(max_workers=len(company_data)) as executor:
+        created = list(executor.map(hubspot_client.create_or_update_company, company_data))
+    companies = [{"id": result.id, "properties": result.properties} for result in created]
     
     # Test batch update with mixed valid/invalid industries
     updates = [
@@ -452,37 +515,39 @@ async def test_batch_update_companies(hubspot_client):
     ]
     
     # Test without custom industries allowed
-    results = client.batch_update_companies(updates)
+    results = hubspot_client.batch_update_companies(updates)
     assert len(results) == 3
     assert results[0]["success"]  # Valid industry should succeed
     assert "error" in results[1]  # Invalid case should fail
     assert "error" in results[2]  # Custom industry should fail without allow_custom
     
     # Test with custom industries allowed
-    results = client.batch_update_companies(updates, allow_custom_industry=True)
+    results = hubspot_client.batch_update_companies(updates, allow_custom_industry=True)
     assert len(results) == 3
     assert results[0]["success"]  # Valid industry should succeed
     assert "error" in results[1]  # Invalid case should still fail
     assert results[2]["success"]  # Custom industry should succeed with allow_custom
     
     # Clean up test companies
-    for company in companies:
-        client.client.crm.companies.basic_api.archive(company_id=company["id"])
+    with ThreadPoolExecutor(max_workers=len(companies)) as executor:
+        list(executor.map(
+            lambda company: hubspot_client.client.crm.companies.basic_api.archive(company_id=company["id"]),
+            companies
+        ))
 
 @pytest.mark.asyncio
-async def test_update_company_with_invalid_industry(hubspot_client):
+async def test_update_company_with_invalid_industry(mutable_hubspot_client):
     """Test updating a company with an invalid industry"""
-    client = await hubspot_client.__anext__()
     
     # First find a company to update
-    results = client.find_companies({"name": "Acme Corporation"})
+    results = mutable_hubspot_client.find_companies({"name": "Acme Corporation"})
     assert len(results) > 0, "Test company should exist"
     
     company_id = results[0]["company"]["id"]
     
     # Test invalid industry
     with pytest.raises(ValueError) as exc_info:
-        client.update_company(
+        mutable_hubspot_client.update_company(
             company_id=company_id,
             properties={"industry": "INVALID_INDUSTRY"}
         )
@@ -490,14 +555,14 @@ async def test_update_company_with_invalid_industry(hubspot_client):
     
     # Test case sensitivity
     with pytest.raises(ValueError) as exc_info:
-        client.update_company(
+        mutable_hubspot_client.update_company(
             company_id=company_id,
             properties={"industry": "Computer-Software"}
         )
     assert "must be uppercase" in str(exc_info.value)
     
     # Test null/empty handling
-    result = json.loads(client.update_company(
+    result = json.loads(mutable_hubspot_client.update_company(
         company_id=company_id,
         properties={"industry": ""}
     ))
@@ -505,7 +570,7 @@ async def test_update_company_with_invalid_industry(hubspot_client):
     assert result["properties"]["industry"] == ""
     
     # Test custom industry
-    result = json.loads(client.update_company(
+    result = json.loads(mutable_hubspot_client.update_company(
         company_id=company_id,
         properties={"industry": "CUSTOM_INDUSTRY"},
         allow_custom_industry=True
@@ -516,12 +581,501 @@ async def test_update_company_with_invalid_industry(hubspot_client):
 @pytest.mark.asyncio
 async def test_mcp_invalid_tool(mcp_server):
     """Test calling an invalid tool"""
-    server = await mcp_server.__anext__()
     request = CallToolRequest(method="tools/call", params={
         "name": "invalid_tool",
         "arguments": {}
     })
     
     with pytest.raises(Exception) as exc_info:
-        await server.handle_call_tool(request)
+        await mcp_server.handle_call_tool(request)
     assert "Unknown tool" in str(exc_info.value)
+
+# Offline tests against a stubbed HubSpot API
+
+class StubContactsApi:
+    """In-memory stand-in for the SDK's contacts basic_api and batch_api"""
+
+    def __init__(self, contact_ids):
+        self.contacts = {contact_id: {} for contact_id in contact_ids}
+        self.calls = []
+
+    def _check(self, contact_id):
+        if contact_id not in self.contacts:
+            raise Exception(f"Contact {contact_id} not found")
+
+    def update(self, contact_id=None, simple_public_object_input=None, batch_input_simple_public_object_batch_input=None):
+        if batch_input_simple_public_object_batch_input is not None:
+            inputs = batch_input_simple_public_object_batch_input["inputs"]
+            self.calls.append(("batch_update", [item["id"] for item in inputs]))
+            # Like HubSpot, one unknown ID fails the whole batch
+            for item in inputs:
+                self._check(item["id"])
+            return SimpleNamespace(results=[self._update(item["id"], item["properties"]) for item in inputs])
+        self.calls.append(("update", contact_id))
+        self._check(contact_id)
+        return self._update(contact_id, simple_public_object_input["properties"])
+
+    def _update(self, contact_id, properties):
+        self.contacts[contact_id].update(properties)
+        return SimpleNamespace(id=contact_id, properties=dict(self.contacts[contact_id]))
+
+    def archive(self, contact_id=None, batch_input_simple_public_object_id=None):
+        if batch_input_simple_public_object_id is not None:
+            contact_ids = [item["id"] for item in batch_input_simple_public_object_id["inputs"]]
+            self.calls.append(("batch_archive", contact_ids))
+            for item_id in contact_ids:
+                self._check(item_id)
+            for item_id in contact_ids:
+                del self.contacts[item_id]
+            return
+        self.calls.append(("archive", contact_id))
+        self._check(contact_id)
+        del self.contacts[contact_id]
+
+class CountingLimiter:
+    """Rate limiter stand-in that counts acquisitions"""
+
+    def __init__(self):
+        self.acquired = 0
+
+    async def __aenter__(self):
+        self.acquired += 1
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+@pytest_asyncio.fixture
+async def stub_server(monkeypatch):
+    """Fixture to create an MCP Server whose HubSpot API calls hit in-memory stubs"""
+    monkeypatch.setenv("HUBSPOT_API_KEY", "test-key")
+    # Tools are called directly, so no MCP transport is needed
+    monkeypatch.setattr(server_module, "McpServer", lambda *args: SimpleNamespace(request_handlers={}))
+    server = Server()
+    contacts = StubContactsApi(["1", "2", "3"])
+    server.hubspot.client = SimpleNamespace(crm=SimpleNamespace(
+        contacts=SimpleNamespace(basic_api=contacts, batch_api=contacts)
+    ))
+    server._limiter = CountingLimiter()
+    yield server
+    # Stop the contact batching worker before the test's event loop closes
+    if server._contact_worker is not None:
+        server._contact_worker.cancel()
+        await asyncio.gather(server._contact_worker, return_exceptions=True)
+
+def call_tool(server, name, arguments):
+    """Call a tool on the server and return its parsed JSON response"""
+    async def call():
+        request = CallToolRequest(method="tools/call", params={"name": name, "arguments": arguments})
+        response = await server.handle_call_tool(request)
+        return json.loads(response["content"][0]["text"])
+    return call()
+
+def test_rate_limit_retry_policy():
+    """Test SDK requests are retried on 429s and connection failures but not read errors"""
+    retry = server_module._RATE_LIMIT_RETRY
+    # A timed-out POST may already have been applied, so it must not be resent
+    with pytest.raises(MaxRetryError):
+        retry.increment(method="POST", error=ReadTimeoutError(None, "/crm/v3/objects/contacts", "timed out"))
+    assert retry.increment(method="POST", error=NewConnectionError(None, "refused")).connect == 2
+    assert retry.is_retry("POST", 429, has_retry_after=True)
+    assert not retry.is_retry("POST", 500)
+
+@pytest.mark.asyncio
+async def test_rate_limiter_paces_acquisitions():
+    """Test acquisitions beyond the bucket's capacity wait for tokens to be earned"""
+    limiter = server_module._RateLimiter(2, 0.1)
+    acquired = []
+    
+    async def acquire():
+        async with limiter:
+            acquired.append(asyncio.get_running_loop().time())
+    
+    start = asyncio.get_running_loop().time()
+    await asyncio.gather(*(acquire() for _ in range(6)))
+    
+    # Two tokens are available at once, then one every 0.05 seconds
+    assert acquired[1] - start < 0.04
+    assert acquired[-1] - start >= 0.19
+
+@pytest.mark.asyncio
+async def test_contact_updates_batched_in_order(stub_server):
+    """Test concurrent contact updates share one batch request and keep their own results"""
+    contacts = stub_server.hubspot.client.crm.contacts.basic_api
+    results = await asyncio.gather(*(
+        call_tool(stub_server, "update_contact", {"contact_id": contact_id, "properties": {"firstname": f"Name {contact_id}"}})
+        for contact_id in ["3", "1", "2"]
+    ))
+    
+    assert [result["id"] for result in results] == ["3", "1", "2"]
+    assert [result["properties"]["firstname"] for result in results] == ["Name 3", "Name 1", "Name 2"]
+    assert contacts.calls == [("batch_update", ["3", "1", "2"])]
+    assert stub_server._limiter.acquired == 1
+
+@pytest.mark.asyncio
+async def test_contact_update_then_delete_same_id(stub_server):
+    """Test an update followed by a delete of the same contact are sent in that order"""
+    contacts = stub_server.hubspot.client.crm.contacts.basic_api
+    update_result, delete_result = await asyncio.gather(
+        call_tool(stub_server, "update_contact", {"contact_id": "1", "properties": {"firstname": "Updated"}}),
+        call_tool(stub_server, "delete_contact", {"contact_id": "1"})
+    )
+    
+    assert update_result["properties"]["firstname"] == "Updated"
+    assert delete_result == {"success": True}
+    assert contacts.calls == [("batch_update", ["1"]), ("batch_archive", ["1"])]
+    assert "1" not in contacts.contacts
+
+@pytest.mark.asyncio
+async def test_contact_batch_with_invalid_id(stub_server):
+    """Test one bad contact ID in a batch only fails that contact's update"""
+    contacts = stub_server.hubspot.client.crm.contacts.basic_api
+    results = await asyncio.gather(*(
+        call_tool(stub_server, "update_contact", {"contact_id": contact_id, "properties": {"firstname": "Updated"}})
+        for contact_id in ["1", "999", "2"]
+    ))
+    
+    assert results[0]["id"] == "1"
+    assert "error" in results[1]
+    assert results[2]["id"] == "2"
+    assert contacts.calls[0] == ("batch_update", ["1", "999", "2"])
+    assert sorted(contacts.calls[1:]) == [("update", "1"), ("update", "2"), ("update", "999")]
+    # Each individual retry is throttled like any other HubSpot call
+    assert stub_server._limiter.acquired == 4
+
+@pytest.mark.asyncio
+async def test_contact_batch_failure_resolves_every_request(stub_server):
+    """Test an unexpected error while sending a batch is raised to every waiting caller"""
+    def fail(*args):
+        raise RuntimeError("connection lost")
+    stub_server.hubspot = SimpleNamespace(batch_update_contacts=fail)
+    
+    results = await asyncio.wait_for(asyncio.gather(*(
+        call_tool(stub_server, "update_contact", {"contact_id": contact_id, "properties": {"firstname": "Updated"}})
+        for contact_id in ["1", "2", "3"]
+    ), return_exceptions=True), timeout=5)
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert all("connection lost" in str(result) for result in results)
+
+def test_json_dump_sdk_records():
+    """Test SDK records serialize to their id, properties and timestamps, and other objects are rejected"""
+    from hubspot.crm.companies import SimplePublicObject
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    record = SimplePublicObject(id="1", properties={"name": "Acme"}, created_at=created, updated_at=created, archived=False)
+    
+    assert json.loads(server_module._dump({"company": record})) == {"company": {
+        "id": "1",
+        "properties": {"name": "Acme"},
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-01-01T00:00:00+00:00",
+        "archived": False
+    }}
+    
+    # Objects that merely have id/properties attributes are not SDK records
+    with pytest.raises(TypeError) as exc_info:
+        server_module._dump(SimpleNamespace(id="1", properties={}))
+    assert "SimpleNamespace" in str(exc_info.value)
+    with pytest.raises(TypeError):
+        server_module._dump(object())
+
+def test_ttl_cache_expiry(monkeypatch):
+    """Test cached entries expire ttl seconds after being stored"""
+    now = [100.0]
+    monkeypatch.setattr(server_module.time, "monotonic", lambda: now[0])
+    cache = server_module._TTLCache(maxsize=2, ttl=60.0)
+    cache.set("a", 1)
+    
+    now[0] = 159.9
+    assert cache.get("a") == 1
+    now[0] = 160.0
+    assert cache.get("a") is None
+    
+    # Storing again restarts the entry's lifetime
+    cache.set("a", 2)
+    now[0] = 219.9
+    assert cache.get("a") == 2
+
+def test_ttl_cache_lru_eviction():
+    """Test the least recently used entry is evicted once the cache is full"""
+    cache = server_module._TTLCache(maxsize=2, ttl=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+    
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+class StubFindClient:
+    """HubSpotClient stand-in whose find_companies can be held mid-search"""
+
+    def __init__(self):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def find_companies(self, criteria, fuzzy_match, threshold):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        return [{"company": {"id": str(self.calls)}, "match_score": 1.0}]
+
+@pytest.mark.asyncio
+async def test_find_companies_responses_cached(stub_server):
+    """Test repeated searches are answered from the cache until a company write"""
+    stub_server.hubspot = StubFindClient()
+    arguments = {"criteria": {"name": "Acme"}}
+    
+    first = await call_tool(stub_server, "find_companies", arguments)
+    second = await call_tool(stub_server, "find_companies", arguments)
+    assert first == second
+    assert stub_server.hubspot.calls == 1
+    
+    stub_server._invalidate_find_cache()
+    await call_tool(stub_server, "find_companies", arguments)
+    assert stub_server.hubspot.calls == 2
+
+@pytest.mark.asyncio
+async def test_find_companies_write_during_search_not_cached(stub_server):
+    """Test a search that overlapped a company write doesn't cache its possibly stale result"""
+    hubspot = stub_server.hubspot = StubFindClient()
+    arguments = {"criteria": {"name": "Acme"}}
+    
+    hubspot.release.clear()
+    search = asyncio.ensure_future(call_tool(stub_server, "find_companies", arguments))
+    await asyncio.get_running_loop().run_in_executor(None, hubspot.started.wait, 5)
+    stub_server._invalidate_find_cache()
+    hubspot.release.set()
+    stale = await search
+    
+    fresh = await call_tool(stub_server, "find_companies", arguments)
+    assert hubspot.calls == 2
+    assert stale[0]["company"]["id"] == "1"
+    assert fresh[0]["company"]["id"] == "2"
+
+@pytest.mark.asyncio
+async def test_find_companies_shared_search_survives_cancelled_caller(stub_server):
+    """Test cancelling one caller of a shared search doesn't cancel it for the others"""
+    hubspot = stub_server.hubspot = StubFindClient()
+    arguments = {"criteria": {"name": "Acme"}}
+    
+    hubspot.release.clear()
+    first = asyncio.ensure_future(call_tool(stub_server, "find_companies", arguments))
+    await asyncio.get_running_loop().run_in_executor(None, hubspot.started.wait, 5)
+    second = asyncio.ensure_future(call_tool(stub_server, "find_companies", arguments))
+    await asyncio.sleep(0)
+    first.cancel()
+    hubspot.release.set()
+    
+    result = await asyncio.wait_for(second, timeout=5)
+    assert result[0]["company"]["id"] == "1"
+    assert first.cancelled()
+    assert hubspot.calls == 1
+
+def stub_company(company_id, **properties):
+    """Build an SDK-like company record"""
+    return SimpleNamespace(id=company_id, properties=properties, created_at=None, updated_at=None, archived=False)
+
+class StubCompaniesApi:
+    """In-memory stand-in for the SDK's companies basic_api"""
+
+    def __init__(self, companies, page_size=2, fail_after=None):
+        self.companies = companies
+        self.page_size = page_size
+        self.fail_after = fail_after
+        self.calls = []
+        self.searches = []
+        self.search_total = None
+
+    def get_page(self, limit=None, after=None, properties=None):
+        self.calls.append(after)
+        if after is not None and after == self.fail_after:
+            raise Exception(f"Page after {after} failed")
+        start = int(after or 0)
+        results = self.companies[start:start + self.page_size]
+        end = start + len(results)
+        paging = SimpleNamespace(next=SimpleNamespace(after=str(end))) if end < len(self.companies) else None
+        return SimpleNamespace(results=results, paging=paging)
+
+    def do_search(self, public_object_search_request):
+        request = public_object_search_request
+        self.searches.append(request)
+        matched = self.companies
+        for search_filter in request["filterGroups"][0]["filters"]:
+            matched = [company for company in matched if company.properties.get(search_filter["propertyName"]) in search_filter["values"]]
+        start = int(request.get("after") or 0)
+        results = matched[start:start + self.page_size]
+        end = start + len(results)
+        paging = SimpleNamespace(next=SimpleNamespace(after=str(end))) if end < len(matched) else None
+        total = self.search_total if self.search_total is not None else len(matched)
+        return SimpleNamespace(results=results, paging=paging, total=total)
+
+def stub_hubspot_client(companies_api):
+    """Create a HubSpotClient whose company calls hit companies_api"""
+    client = HubSpotClient("test-key")
+    client.client = SimpleNamespace(crm=SimpleNamespace(companies=SimpleNamespace(
+        basic_api=companies_api, search_api=companies_api, batch_api=companies_api
+    )))
+    return client
+
+def page_threads_alive():
+    """Whether any company page prefetch thread is still running"""
+    return any(thread.name.startswith("hubspot-pages") for thread in threading.enumerate())
+
+def test_company_pages_prefetched_in_order():
+    """Test company pages are yielded in order with every page fetched once"""
+    api = StubCompaniesApi([stub_company(str(i)) for i in range(5)])
+    client = stub_hubspot_client(api)
+    
+    pages = [[company.id for company in page.results] for page in client._iter_company_pages(["name"])]
+    
+    assert pages == [["0", "1"], ["2", "3"], ["4"]]
+    assert api.calls == [None, "2", "4"]
+    assert not page_threads_alive()
+
+def test_company_pages_early_exit():
+    """Test the prefetch worker is shut down when the caller stops iterating early"""
+    api = StubCompaniesApi([stub_company(str(i)) for i in range(10)])
+    client = stub_hubspot_client(api)
+    
+    pages = client._iter_company_pages(["name"])
+    first = next(pages)
+    pages.close()
+    
+    assert [company.id for company in first.results] == ["0", "1"]
+    # At most the one page prefetched behind the first was requested
+    assert api.calls == [None, "2"]
+    assert not page_threads_alive()
+
+def test_company_pages_failing_page():
+    """Test an error fetching a prefetched page is raised to the caller"""
+    api = StubCompaniesApi([stub_company(str(i)) for i in range(5)], fail_after="2")
+    client = stub_hubspot_client(api)
+    
+    pages = client._iter_company_pages(["name"])
+    assert [company.id for company in next(pages).results] == ["0", "1"]
+    with pytest.raises(Exception) as exc_info:
+        next(pages)
+    assert "Page after 2 failed" in str(exc_info.value)
+    assert not page_threads_alive()
+
+def test_find_companies_industry_search_filter():
+    """Test exact industry-only searches filter server-side on every alias of the industry"""
+    api = StubCompaniesApi([
+        stub_company("0", name="Acme", industry="COMPUTER_SOFTWARE"),
+        stub_company("1", name="Globex", industry="BANKING"),
+        stub_company("2", name="Initech", industry="SOFTWARE"),
+    ])
+    client = stub_hubspot_client(api)
+    
+    results = client.find_companies({"industry": "Software"}, fuzzy_match=False)
+    
+    assert [result["company"]["id"] for result in results] == ["0", "2"]
+    assert api.calls == []
+    assert api.searches[0]["filterGroups"] == [{"filters": [{
+        "propertyName": "industry",
+        "operator": "IN",
+        "values": ["COMPUTER_SOFTWARE", "SOFTWARE", "SOFTWARE_DEVELOPMENT"]
+    }]}]
+    assert api.searches[0]["properties"] == ["name", "domain", "industry"]
+
+def test_find_companies_large_industry_search_lists_instead():
+    """Test a search matching more than the search API can page through lists companies instead"""
+    api = StubCompaniesApi([
+        stub_company("0", name="Acme", industry="COMPUTER_SOFTWARE"),
+        stub_company("1", name="Globex", industry="BANKING"),
+        stub_company("2", name="Initech", industry="COMPUTER_SOFTWARE"),
+    ])
+    api.search_total = 10001
+    client = stub_hubspot_client(api)
+    
+    results = client.find_companies({"industry": "COMPUTER_SOFTWARE"}, fuzzy_match=False)
+    
+    assert [result["company"]["id"] for result in results] == ["0", "2"]
+    assert len(api.searches) == 1
+    assert api.calls == [None, "2"]
+
+def test_create_or_update_company_does_not_search():
+    """Test create_or_update_company matches against the listing, not the lagging search index"""
+    api = StubCompaniesApi([stub_company("0", name="Acme", industry="COMPUTER_SOFTWARE")])
+    api.update = lambda company_id, simple_public_object_input: stub_company(company_id, **simple_public_object_input["properties"])
+    client = stub_hubspot_client(api)
+    
+    result = client.create_or_update_company({"industry": "COMPUTER_SOFTWARE"}, fuzzy_match=False)
+    
+    assert result.id == "0"
+    assert api.searches == []
+    assert api.calls == [None]
+
+def test_find_companies_top_n_matches_full_sort():
+    """Test top_n returns the same companies, in the same order, as the head of the full sorted results"""
+    names = ["Acme Corp", "Acme", "Globex", "Acme Co", "Acme", "Acmee", "Acme Corp", "Initech", "Acme", "Acne", "Acme Co", "Acme"]
+    api = StubCompaniesApi([stub_company(str(i), name=name) for i, name in enumerate(names)], page_size=3)
+    client = stub_hubspot_client(api)
+    
+    full = client.find_companies({"name": "Acme"}, threshold=0.5)
+    scores = [result["match_score"] for result in full]
+    assert len(set(scores)) < len(scores), "Results should include ties"
+    # Ties keep scan order, as the stable full sort does
+    assert [result["company"]["id"] for result in full[:4]] == ["1", "4", "8", "11"]
+    
+    for top_n in [0, 1, 2, 4, 5, 7, len(names)]:
+        top = client.find_companies({"name": "Acme"}, threshold=0.5, top_n=top_n)
+        assert top == full[:top_n], f"top_n={top_n} should match the full sort"
+
+class StubCompanyBatchApi:
+    """Stand-in for the SDK's companies batch_api and basic_api updates"""
+
+    def __init__(self, failing_batches=(), missing_ids=()):
+        self.failing_batches = set(failing_batches)
+        self.missing_ids = set(missing_ids)
+        self.updated = []
+        self.lock = threading.Lock()
+
+    def update(self, batch_input_simple_public_object_batch_input=None, company_id=None, simple_public_object_input=None):
+        if batch_input_simple_public_object_batch_input is None:
+            if company_id in self.missing_ids:
+                raise Exception(f"Company {company_id} not found")
+            with self.lock:
+                self.updated.append(company_id)
+            return SimpleNamespace(id=company_id, properties=simple_public_object_input["properties"])
+        inputs = batch_input_simple_public_object_batch_input["inputs"]
+        first = int(inputs[0]["id"])
+        # Later batches finish first, so results can't come back in order by accident
+        time.sleep(0.05 / (1 + first // 100))
+        if first // 100 in self.failing_batches:
+            raise Exception("Batch failed")
+        with self.lock:
+            self.updated.extend(item["id"] for item in inputs)
+        return SimpleNamespace(status=[
+            SimpleNamespace(id=item["id"], status_code=200, properties=item["properties"], message=None)
+            for item in inputs
+        ])
+
+def test_batch_update_companies_concurrent_order():
+    """Test results from concurrently sent batches come back in input order"""
+    api = StubCompanyBatchApi()
+    client = stub_hubspot_client(api)
+    updates = [{"company_id": str(i), "properties": {"name": f"Company {i}"}} for i in range(350)]
+    
+    results = client.batch_update_companies(updates)
+    
+    assert [result["company_id"] for result in results] == [str(i) for i in range(350)]
+    assert all(result["success"] for result in results)
+    assert sorted(api.updated, key=int) == [str(i) for i in range(350)]
+
+def test_batch_update_companies_failing_batch_falls_back():
+    """Test a failing batch is retried per company without losing the other batches"""
+    api = StubCompanyBatchApi(failing_batches={1}, missing_ids={"150"})
+    client = stub_hubspot_client(api)
+    updates = [{"company_id": str(i), "properties": {"name": f"Company {i}"}} for i in range(250)]
+    
+    results = client.batch_update_companies(updates)
+    
+    assert [result["company_id"] for result in results] == [str(i) for i in range(250)]
+    failed = [result for result in results if "error" in result]
+    assert [result["company_id"] for result in failed] == ["150"]
+    assert "Company 150 not found" in failed[0]["error"]
+    assert sorted(api.updated, key=int) == [str(i) for i in range(250) if i != 150]